@@ -0,0 +1,123 @@
+import argparse
+import logging
+import sys
+from config.config import Config
+from utils.messages import logger
+
+
+# Return codes of the commands
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INVALID_CONFIG = 2
+EXIT_INVALID_ROOT_PAGE = 3
+
+
+def load_config(path: str) -> Config | None:
+    """Load and validate a configuration file, return None (after logging why) if it can't be used
+    :param path: the path of the configuration file
+    """
+    config = Config()
+    if not config.load_config_if_valid(path):
+        logger.error(f"Invalid configuration: {path}")
+        return None
+    return config
+
+
+def validate_command(args: argparse.Namespace) -> int:
+    """Check that a configuration file matches the schema"""
+    if load_config(args.config) is None:
+        return EXIT_INVALID_CONFIG
+
+    logger.info(f"{args.config} is valid")
+    return EXIT_OK
+
+
+def plan_command(args: argparse.Namespace) -> int:
+    """Compile a configuration into a plan (without network access), print its size and save it if asked"""
+
+    config = load_config(args.config)
+    if config is None:
+        return EXIT_INVALID_CONFIG
+
+    from notion.client_config import get_client_config
+    from notion.generation_plan import GenerationPlan
+
+    plan = GenerationPlan.compile(config, get_client_config().admin_info())
+    nb_nodes_by_kind = {}
+    for node in plan.nodes:
+        nb_nodes_by_kind[node.kind] = nb_nodes_by_kind.get(node.kind, 0) + 1
+    logger.info(f"Plan {plan.school_year}: {len(plan)} nodes ({', '.join(f'{nb} {kind}' for kind, nb in nb_nodes_by_kind.items())})")
+
+    if args.output:
+        plan.save(args.output)
+        logger.info(f"Plan saved in {args.output}")
+
+    return EXIT_OK
+
+
+def generate_command(args: argparse.Namespace) -> int:
+    """Generate (or resume) the calendar under a root page, or synchronise the databases already generated"""
+
+    config = load_config(args.config)
+    if config is None:
+        return EXIT_INVALID_CONFIG
+
+    import requests
+    from notion.notion_client import NotionAPIError, get_default_client
+    from notion.notion_page import NotionPage
+
+    # The cause of a failure (bad API key, network error) is logged by check_root_page
+    match NotionPage.check_root_page(args.root_page_id):
+        case "invalid":
+            logger.error(f"The Notion page {args.root_page_id} doesn't exist or isn't shared with the integration")
+            return EXIT_INVALID_ROOT_PAGE
+        case "unauthorized" | "unreachable":
+            logger.error(f"The Notion page {args.root_page_id} couldn't be checked")
+            return EXIT_FAILED
+
+    try:
+        if args.command == "sync":
+            NotionPage.sync_pages_from_config(config, args.root_page_id, journal_path=args.journal)
+        else:
+            NotionPage.create_pages_from_config(config, args.root_page_id, journal_path=args.journal)
+    except (NotionAPIError, requests.RequestException, RuntimeError, OSError) as error:
+        logger.error(f"{args.command} failed: {error}")
+        return EXIT_FAILED
+
+    logger.info(f"{args.command} done: {get_default_client().get_stats()['nb_requests']} requests sent")
+    return EXIT_OK
+
+
+def main(argv: list = None) -> int:
+    """Run a command without the GUI and return its exit code
+    :param argv: the arguments of the command line (sys.argv[1:] if None)
+    """
+
+    parser = argparse.ArgumentParser(description="Générateur de calendriers Notion, sans interface graphique")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log debug messages")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate_parser = commands.add_parser("validate", help="check that a configuration is valid")
+    validate_parser.add_argument("config", help="path of the configuration file")
+    validate_parser.set_defaults(function=validate_command)
+
+    plan_parser = commands.add_parser("plan", help="compile the configuration into a plan, without network access")
+    plan_parser.add_argument("config", help="path of the configuration file")
+    plan_parser.add_argument("-o", "--output", help="path of the JSON file where the plan is saved")
+    plan_parser.set_defaults(function=plan_command)
+
+    for command, help in [("generate", "generate (or resume) the calendar under the root page"), ("sync", "synchronise the databases already generated with the configuration")]:
+        command_parser = commands.add_parser(command, help=help)
+        command_parser.add_argument("config", help="path of the configuration file")
+        command_parser.add_argument("root_page_id", help="id of the Notion root page")
+        command_parser.add_argument("--journal", help="path of the journal (journal_<root_page_id>.jsonl next to the configuration file if not given)")
+        command_parser.set_defaults(function=generate_command)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,48 @@
 import datetime
+import hashlib
 import json
 import os
+import threading
 from pathlib import Path
-from tkinter import messagebox
 from typing import Dict
-from jsonschema import validate
 from config.config_schema import schema
+from utils.messages import show_error
+
+
+# Maximum number of errors listed in the message shown to the user (the others are only counted)
+MAX_DISPLAYED_ERRORS = 10
+
+# Validator of the configuration schema, compiled once per process (see get_config_validator)
+_config_validator = None
+_config_validator_lock = threading.Lock()
+
+# Hash of the content of the last configuration file that was valid (its validation is skipped when it is loaded again)
+_last_valid_config_hash = None
+
+
+def get_config_validator():
+    """Return the validator of config_schema.schema, the schema is checked against its metaschema on first use only"""
+    global _config_validator
+
+    with _config_validator_lock:
+        if _config_validator is None:
+            # jsonschema is slow to import, it is only needed when a configuration is validated
+            from jsonschema.validators import validator_for
+
+            validator_class = validator_for(schema)
+            validator_class.check_schema(schema)
+            _config_validator = validator_class(schema)
+        return _config_validator
+
+
+def get_config_errors(config: Dict) -> list[str]:
+    """Return all the errors of a configuration (an empty list if it matches the schema), sorted by their location
+    :param config: the configuration to check
+    """
+
+    errors = sorted(get_config_validator().iter_errors(config), key=lambda error: error.json_path)
+    return [f"{error.json_path}: {error.message}" for error in errors]
+
 
 class Config():
     """Class that handles the configuration of the calendar to generate"""
@@ -28,18 +65,19 @@ class Config():
         if os.path.isfile(path):
             # Try to load a configuration
             try:
-                with open(path, 'r') as config_file:
-                    self.config = json.load(config_file)
+                with open(path, 'rb') as config_file:
+                    content = config_file.read()
+                    self.config = json.loads(content)
                     
                      # Check if the configuration matches the correct schema defined in config_schema.py
-                    if not self.is_valid_config():
+                    if not self.is_valid_config(hashlib.sha256(content).hexdigest()):
                         self.reset_config()
                         return False
                     
                     self.config_file_path = path
 
-            except json.JSONDecodeError:
-                messagebox.showerror("Erreur", "Le fichier sélectionné n'est pas un fichier .json valide")
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                show_error("Erreur", "Le fichier sélectionné n'est pas un fichier .json valide")
                 return False   
     
             return True
@@ -61,7 +99,7 @@ class Config():
                 with open(empty_config_file_path, 'r') as config_file:
                     self.config = json.load(config_file)
             except json.JSONDecodeError:
-                messagebox.showerror("Erreur", "Le fichier de configuration vide est introuvable")
+                show_error("Erreur", "Le fichier de configuration vide est introuvable")
                 return False
             
             # Dictionnaries to add to empty config
@@ -150,16 +188,28 @@ class Config():
         self.config = {}
         self.config_file_path = ""
     
-    def is_valid_config(self) -> bool:
-        """Check if the current configuration is valid"""
+    def is_valid_config(self, content_hash: str = None) -> bool:
+        """Check if the current configuration is valid, all the errors are reported at once
+        :param content_hash: str: hash of the content of the configuration file, the validation is skipped if it is the hash of the last valid file
+        """
+        global _last_valid_config_hash
 
         # Check that the config exists and is not null
         if self.config is not None:
-            try:
-                validate(self.config, schema=schema)
+            # Same content as the last valid file
+            if content_hash is not None and content_hash == _last_valid_config_hash:
                 return True
-            except Exception as error:
-                messagebox.showerror("Erreur", f"{error}")
+
+            errors = get_config_errors(self.config)
+            if errors:
+                message = "\n".join(errors[:MAX_DISPLAYED_ERRORS])
+                if len(errors) > MAX_DISPLAYED_ERRORS:
+                    message += f"\n... et {len(errors) - MAX_DISPLAYED_ERRORS} autres erreurs"
+                show_error("Erreur", f"La configuration contient {len(errors)} erreur(s) :\n{message}")
                 return False
+
+            if content_hash is not None:
+                _last_valid_config_hash = content_hash
+            return True
         else:
             return False
@@ -0,0 +1,190 @@
+import re
+import threading
+from typing import Dict
+from config.config_schema import schema
+from utils.utils import day_to_value, parse_date
+
+
+# Objects of the configuration that can be validated on their own: pattern of their dotted key -> name of their subschema in schema["$defs"]
+FIELD_SCOPES = [
+    (re.compile(r"^infos_generales\.(vacances|jours_feries)\.[^.]+$"), "DateRange"),
+    (re.compile(r"^niveaux\.[^.]+\.[^.]+\.classes\.[^.]+\.cours_\d+$"), "CourseInfo"),
+    (re.compile(r"^niveaux\.[^.]+\.[^.]+\.classes\.[^.]+$"), "ClassInfo"),
+    (re.compile(r"^niveaux\.[^.]+\.[^.]+\.infos_generales$"), "MoodleAndJupyter"),
+]
+
+# Validators of the subschemas, compiled on first use (see get_subschema_validator)
+_subschema_validators = {}
+_subschema_validators_lock = threading.Lock()
+
+
+def get_subschema_validator(name: str):
+    """Return the validator of a subschema of config_schema.schema (the $ref to the other subschemas are kept)
+    :param name: the name of the subschema in schema["$defs"] (e.g. "DateRange")
+    """
+
+    with _subschema_validators_lock:
+        if name not in _subschema_validators:
+            # jsonschema is slow to import, it is only needed when a configuration is validated
+            from jsonschema.validators import validator_for
+
+            subschema = {"$schema": schema["$schema"], "$defs": schema["$defs"], "$ref": f"#/$defs/{name}"}
+            validator_class = validator_for(subschema)
+            validator_class.check_schema(subschema)
+            _subschema_validators[name] = validator_class(subschema)
+        return _subschema_validators[name]
+
+
+def get_field_scope(key: str) -> tuple[str, str | None]:
+    """Return the dotted key of the object containing a field and the name of its subschema (None if the object has none)
+    :param key: the dotted key of the field (e.g. "infos_generales.vacances.noel.date_debut")
+    """
+
+    parent_key = key.rpartition(".")[0]
+    for pattern, name in FIELD_SCOPES:
+        if pattern.match(parent_key):
+            return parent_key, name
+    return parent_key, None
+
+
+def get_value(config: Dict, key: str):
+    """Return the value at a dotted key of the configuration
+    :param config: the configuration
+    :param key: the dotted key ("" for the whole configuration)
+    """
+
+    value = config
+    if key:
+        for current_path in key.split("."):
+            value = value[current_path]
+    return value
+
+
+def coerce_field_value(key: str, value: str):
+    """Convert the text typed in the editor to the type the schema expects for the field (the text is kept if it can't be converted)
+    :param key: the dotted key of the field
+    :param value: the text typed by the user
+    """
+
+    _, name = get_field_scope(key)
+    if name is not None:
+        field_schema = schema["$defs"][name]["properties"].get(key.rpartition(".")[2], {})
+        if field_schema.get("type") == "integer":
+            try:
+                return int(value)
+            except ValueError:
+                pass
+    return value
+
+
+def check_date(value) -> str | None:
+    """Return the error of a date field (an empty field is not filled in yet, so it isn't an error)
+    :param value: the value of the field
+    """
+
+    if isinstance(value, str) and value != "":
+        try:
+            parse_date(value)
+        except ValueError:
+            return f"'{value}' n'est pas une date valide (AAAA-MM-JJ)"
+    return None
+
+
+def check_date_range(date_range: Dict) -> list[tuple[str, str]]:
+    """Cross-field checks of a DateRange: the dates are valid and date_debut <= date_fin
+    :param date_range: the DateRange object
+    """
+
+    errors = []
+    for field in ["date_debut", "date_fin"]:
+        error = check_date(date_range.get(field))
+        if error is not None:
+            errors.append((field, error))
+
+    if not errors and date_range.get("date_debut") and date_range.get("date_fin"):
+        if parse_date(date_range["date_debut"]) > parse_date(date_range["date_fin"]):
+            errors.append(("date_debut", "date_debut doit être antérieure ou égale à date_fin"))
+    return errors
+
+
+def check_course_info(course_info: Dict) -> list[tuple[str, str]]:
+    """Cross-field checks of a CourseInfo: the day is a valid day name and heure_debut < heure_fin
+    :param course_info: the CourseInfo object
+    """
+
+    errors = []
+    day = course_info.get("jour")
+    if isinstance(day, str) and day != "" and day_to_value(day) == -1:
+        errors.append(("jour", f"'{day}' n'est pas un jour valide (lundi, mardi, mercredi, jeudi, vendredi, samedi, dimanche)"))
+
+    times = {}
+    for field in ["heure_debut", "heure_fin"]:
+        value = course_info.get(field)
+        if isinstance(value, str) and value != "":
+            if re.fullmatch(r"([01]?\d|2[0-3]):[0-5]\d", value) is None:
+                errors.append((field, f"'{value}' n'est pas une heure valide (HH:MM)"))
+            else:
+                hours, minutes = value.split(":")
+                times[field] = int(hours) * 60 + int(minutes)
+
+    if len(times) == 2 and times["heure_debut"] >= times["heure_fin"]:
+        errors.append(("heure_debut", "heure_debut doit être antérieure à heure_fin"))
+    return errors
+
+
+def check_class_info(class_info: Dict) -> list[tuple[str, str]]:
+    """Cross-field checks of a ClassInfo: the number of students isn't negative
+    :param class_info: the ClassInfo object
+    """
+
+    nb_students = class_info.get("nb_eleves")
+    if isinstance(nb_students, int) and nb_students < 0:
+        return [("nb_eleves", "nb_eleves ne peut pas être négatif")]
+    return []
+
+
+# Cross-field checks of each subschema (what the schema alone can't express)
+CROSS_FIELD_CHECKS = {
+    "DateRange": check_date_range,
+    "CourseInfo": check_course_info,
+    "ClassInfo": check_class_info,
+}
+
+
+def get_field_errors(config: Dict, key: str) -> dict[str, list[str]]:
+    """Validate only the object containing an edited field (its subschema and its cross-field checks), not the whole configuration
+    :param config: the configuration
+    :param key: the dotted key of the edited field (from item_id_to_key_mapping)
+    :return: the errors by dotted key (the key of a field, or of the object itself for e.g. a missing property), empty if the object is valid
+    """
+
+    parent_key, name = get_field_scope(key)
+    errors = {}
+
+    def add_error(error_key: str, message: str) -> None:
+        errors.setdefault(error_key, []).append(message)
+
+    # The first monday of the school year is the only field outside of a subschema
+    if key == "infos_generales.lundi_semaine_0":
+        value = get_value(config, key)
+        error = check_date(value)
+        if error is None and value and parse_date(value).weekday() != 0:
+            error = f"'{value}' n'est pas un lundi"
+        if error is not None:
+            add_error(key, error)
+        return errors
+
+    if name is None:
+        return errors
+
+    scope = get_value(config, parent_key)
+    for error in get_subschema_validator(name).iter_errors(scope):
+        error_key = ".".join([parent_key] + [str(path) for path in error.path])
+        add_error(error_key, error.message)
+
+    # The cross-field checks assume the types of the schema
+    if not errors and name in CROSS_FIELD_CHECKS:
+        for field, message in CROSS_FIELD_CHECKS[name](scope):
+            add_error(f"{parent_key}.{field}", message)
+
+    return errors
@@ -29,6 +29,12 @@ class JsonEditor:
         # pprint.pprint(self.key_to_item_id_mapping)
         self.expand_all()
 
+        # Input field used to edit a value (None until the user double clicks on a value)
+        self.entry_popup = None
+
+        # Fields whose value is invalid are displayed in red
+        self.tree.tag_configure("invalid", foreground="red")
+
         # Make the tree editable when the user double clicks
         self.tree.bind("<Double-1>", self.edit_value)
 
@@ -92,6 +98,10 @@ class JsonEditor:
             # Get column position info
             x, y, width, mheight = self.tree.bbox(rowid, column)
 
+            # Close the entry popup left open with errors on another value
+            if self.entry_popup is not None and self.entry_popup.winfo_exists():
+                self.entry_popup.destroy()
+
             # Create the entry popup
             self.entry_popup = EntryPopup(self.tree, rowid, self.tree.item(
                 rowid, "values")[0], self.config, self.item_id_to_key_mapping)
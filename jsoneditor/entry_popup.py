@@ -1,6 +1,7 @@
 from tkinter import ttk
 import tkinter as tk
 from typing import Dict
+from config.field_validation import coerce_field_value, get_field_errors
 
 class EntryPopup(ttk.Entry):
     """Class that creates a popup to edit a value in a treeview"""
@@ -19,6 +20,9 @@ class EntryPopup(ttk.Entry):
         self.tree_data = config.config
         self.item_id_to_key_mapping = item_id_to_key_mapping
 
+        # Label displaying the errors of the value under the input field (created on the first error)
+        self.error_label = None
+
         # The default text in the input field is the old value
         self.insert(0, old_value)
 
@@ -40,21 +44,62 @@ class EntryPopup(ttk.Entry):
         self.tv.set(self.iid, "Column1", new_value)
 
         # Update the tree data accordingly using the item id and the item_id_to_key_mapping dictionary
-        full_paths = self.item_id_to_key_mapping[self.iid].split(".")
+        key = self.item_id_to_key_mapping[self.iid]
+        full_paths = key.split(".")
         current_data = self.tree_data
 
         for current_path in full_paths[:-1]:
             current_data = current_data[current_path]
 
-        # Update the dictionary with the new value at the correct position
-        current_data[full_paths[-1]] = new_value
+        # Update the dictionary with the new value at the correct position (converted to the type expected by the schema)
+        current_data[full_paths[-1]] = coerce_field_value(key, new_value)
 
         # Update the app config by saving the modification in the associated file
         self.config.save_config_from_dict(self.tree_data)
 
+        # Validate only the object containing the value, and highlight its invalid fields
+        errors = get_field_errors(self.tree_data, key)
+        self.highlight_invalid_fields(errors)
+
+        # Keep the entry open with the errors under it (the value is saved anyway, as fixing it may require editing another field)
+        if errors:
+            messages = []
+            for error_key, error_messages in errors.items():
+                # The errors of the other fields are prefixed by the name of their field
+                prefix = "" if error_key == key else f"{error_key.rpartition('.')[2]}: "
+                messages += [f"{prefix}{message}" for message in error_messages]
+            self.show_errors(messages)
+            return
+
         # Destroy the entry
         self.destroy()
 
+    def highlight_invalid_fields(self, errors: dict[str, list[str]]) -> None:
+        """Display in red the fields with errors among the fields of the edited object
+        :param errors: dict[str, list[str]]: errors by dotted key, as returned by get_field_errors
+        """
+        for item in self.tv.get_children(self.tv.parent(self.iid)):
+            if self.item_id_to_key_mapping.get(item) in errors:
+                self.tv.item(item, tags=("invalid",))
+            else:
+                self.tv.item(item, tags=())
+
+    def show_errors(self, messages: list[str]) -> None:
+        """Display the errors under the input field
+        :param messages: list[str]: error messages
+        """
+        if self.error_label is None:
+            self.error_label = tk.Label(self.tv, fg="red", bg="white", anchor="w", justify="left")
+        self.error_label.config(text="\n".join(messages))
+        self.error_label.place(x=0, y=self.winfo_y() + self.winfo_height(), relwidth=1)
+
+    def destroy(self) -> None:
+        """Destroy the input field and its errors"""
+        if self.error_label is not None:
+            self.error_label.destroy()
+            self.error_label = None
+        super().destroy()
+
     def select_all(self, *ignore) -> str:
         """Function that selects all the text in the input field"""
         self.selection_range(0, 'end')
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Iterator
+from notion.notion_client import NotionClient
+from notion.paginator import iter_pages
+
+
+# Blocks whose children are other pages or databases, they are never read as the content of a page
+CHILD_PAGE_TYPES = ["child_page", "child_database"]
+
+
+class BlockReader:
+    """Class that streams the children blocks of a page (or a block), following the pagination of the Notion API
+    The next page of results is fetched while the caller processes the current one, and at most one page of results
+    per level of nesting is held in memory.
+    """
+
+    def __init__(self, client: NotionClient, page_size: int = 100) -> None:
+        """Constructor of the BlockReader class
+        :param client: the Notion client used to send the requests
+        :param page_size: the number of blocks fetched per request (at most 100)
+        """
+        self.client = client
+        self.page_size = min(max(1, page_size), 100)
+
+    def iter_blocks(self, block_id: str, recursive: bool = False) -> Iterator[tuple[int, dict]]:
+        """Yield (depth, block) for each child of a block, in the order of the page, as soon as each page of results arrives
+        When recursive is True, the children of a block are yielded right after it (with depth + 1).
+        :param block_id: the id of the page or the block
+        :param recursive: if True, read the nested children too (but not the content of child pages and databases)
+        """
+
+        # A single worker prefetches the next page of results of every level of nesting
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            yield from self.iter_children(executor, block_id, recursive, 0)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_children(self, executor: ThreadPoolExecutor, block_id: str, recursive: bool, depth: int) -> Iterator[tuple[int, dict]]:
+        """Yield (depth, block) for each child of a block, prefetching the next page of results with the executor
+        :param executor: the executor that fetches the pages of results
+        :param block_id: the id of the page or the block
+        :param recursive: if True, read the nested children too
+        :param depth: the depth of the children
+        """
+
+        for page in iter_pages(executor, partial(self.fetch_page, block_id)):
+            for block in page["results"]:
+                yield depth, block
+
+                if recursive and block.get("has_children") and block.get("type") not in CHILD_PAGE_TYPES:
+                    yield from self.iter_children(executor, block["id"], recursive, depth + 1)
+
+    def fetch_page(self, block_id: str, start_cursor: str = None) -> dict:
+        """GET one page of children of a block
+        :param block_id: the id of the page or the block
+        :param start_cursor: the cursor returned by the previous page (first page if None)
+        """
+        path = f"blocks/{block_id}/children?page_size={self.page_size}"
+        if start_cursor:
+            path += f"&start_cursor={start_cursor}"
+        return self.client.get(path).json()
@@ -0,0 +1,182 @@
+from functools import partial
+from notion.generation_journal import ARCHIVED_HASH, GenerationJournal, payload_hash
+from notion.generation_plan import GenerationPlan, PlanNode
+from notion.notion_client import NotionClient
+from notion.notion_db import NotionDB
+from notion.row_table import property_value
+from notion.task_graph import TaskGraph
+from utils.messages import logger
+
+
+# Columns computed from the configuration, the other columns (groups, topics, remarks) are edited by hand in Notion and never overwritten
+SYNCED_PROPERTIES = ["Nom", "Durée du cours", "Modalité du cours", "Série de semaine"]
+
+# Properties of a row updated when its payload changed (the key and the columns computed from the configuration)
+UPDATED_ROW_PROPERTIES = ["title", "Classe", "Date du cours", *SYNCED_PROPERTIES]
+
+
+class CalendarSync:
+    """Class that updates the existing year databases so that they match the configuration, with as few requests as possible"""
+
+    def __init__(self, client: NotionClient, journal: GenerationJournal) -> None:
+        """Constructor of the CalendarSync class
+        :param client: the Notion client used to send the requests
+        :param journal: the journal of the generation, used to find the databases and updated with the rows created/modified
+        """
+        self.client = client
+        self.journal = journal
+
+    def sync(self, plan: GenerationPlan, root_page_id: str) -> dict:
+        """Compare each year database with the plan and send only the PATCH/POST/archive requests needed
+        Return the number of rows created, updated, archived and unchanged, and the keys of the databases never generated (not synchronised)
+        :param plan: the plan compiled from the new configuration
+        :param root_page_id: the id of the Notion page under which the calendar was generated
+        """
+
+        journal_prefix = f"{root_page_id}/{plan.school_year}/"
+        summary = {"created": 0, "updated": 0, "archived": 0, "unchanged": 0, "not_generated": []}
+        graph = TaskGraph(max_workers=self.client.pool_size)
+
+        # Journal keys of each row created by the generator, the rows added by hand in Notion are never archived
+        recorded_rows = {}
+        for key, entry in self.journal.entries.items():
+            if key.startswith(journal_prefix + "row/"):
+                recorded_rows.setdefault(entry["id"], []).append(key[len(journal_prefix):])
+
+        for database_node in [node for node in plan.nodes if node.kind == "database"]:
+
+            # The database must have been generated before
+            entry = self.journal.get(journal_prefix + database_node.key)
+            if entry is None:
+                logger.warning(f"{database_node.key} has never been generated: it cannot be synchronised")
+                summary["not_generated"].append(database_node.key)
+                continue
+
+            rows = [node for node in plan.nodes if node.kind == "row" and node.parent == database_node.key]
+            column_types = {name: column["type"] for name, column in database_node.payload["properties"].items()}
+            ids = {database_node.key: entry["id"]}
+
+            for operation, arguments in self.diff_database(NotionDB(entry["id"], client=self.client), rows, column_types, ids, recorded_rows, journal_prefix):
+                summary[operation] += 1
+                if operation != "unchanged":
+                    graph.add_task(f"{operation}/{len(graph.tasks)}", partial(getattr(self, operation), *arguments, journal_prefix))
+
+        graph.run()
+
+        return summary
+
+    def diff_database(self, database: NotionDB, rows: list[PlanNode], column_types: dict, ids: dict, recorded_rows: dict, journal_prefix: str) -> list[tuple]:
+        """Return the operations needed so that the rows of a database match the rows of the plan
+        A row is matched first with the page recorded in the journal for its key, so that a lesson moved to another date is updated,
+        then (rows never recorded, e.g. a new course) with an existing page of the same class and date.
+        Each operation is a tuple (name, arguments), name can be one of the following: "created", "updated", "archived", "unchanged"
+        :param database: the existing database
+        :param rows: the rows of the plan for this database
+        :param column_types: the type of each column of the database
+        :param ids: the Notion id of the database node, used to resolve the references of the rows
+        :param recorded_rows: the journal keys of each row created by the generator (only these rows can be archived)
+        :param journal_prefix: the prefix of the keys in the journal
+        """
+
+        title_column = next(name for name, column_type in column_types.items() if column_type == "title")
+        existing_pages = {page["id"]: page for page in database.query_all_rows()}
+
+        operations = []
+        managed_classes = set()
+        payloads = {row.key: row.notion_payload(ids, {}) for row in rows}
+
+        # The page recorded in the journal for the key of each row
+        matches = {}
+        for row in rows:
+            payload = payloads[row.key]
+            managed_classes.add(property_value("select", payload["properties"]["Classe"]))
+
+            entry = self.journal.get(journal_prefix + row.key)
+            if entry is not None and entry["id"] in existing_pages:
+                matches[row.key] = existing_pages.pop(entry["id"])
+
+            # A row archived by a previous run (its course was removed) is restored
+            elif entry is not None and entry["hash"] == ARCHIVED_HASH:
+                matches[row.key] = None
+                restored = {name: value for name, value in payload["properties"].items() if name in UPDATED_ROW_PROPERTIES}
+                operations.append(("updated", (row, entry["id"], entry["url"], restored, True)))
+
+        # Index of the other existing rows by (Classe, Date du cours)
+        pages_by_date = {}
+        for page in existing_pages.values():
+            key = (property_value("select", page["properties"]["Classe"]), property_value("date", page["properties"]["Date du cours"]))
+            pages_by_date.setdefault(key, []).append(page)
+
+        for row in rows:
+            payload = payloads[row.key]
+
+            # The title of a row is sent with the "title" key instead of the name of the title column
+            properties = {(title_column if name == "title" else name): value for name, value in payload["properties"].items()}
+
+            if row.key in matches:
+                page = matches[row.key]
+                if page is None:
+                    continue
+            else:
+                key = (property_value("select", properties["Classe"]), property_value("date", properties["Date du cours"]))
+                if not pages_by_date.get(key):
+                    operations.append(("created", (row, payload)))
+                    continue
+
+                # A row created by the generator is preferred to a row added by hand for the same class and date
+                pages = pages_by_date[key]
+                page = pages.pop(next((index for index, candidate in enumerate(pages) if candidate["id"] in recorded_rows), 0))
+
+            # The date is compared too: a lesson matched by its key may have moved (e.g. a holiday added before it)
+            changes = {
+                ("title" if name == title_column else name): payload["properties"]["title" if name == title_column else name]
+                for name in [*SYNCED_PROPERTIES, "Date du cours"]
+                if property_value(column_types[name], properties[name]) != property_value(column_types[name], page["properties"][name])
+            }
+
+            if changes:
+                operations.append(("updated", (row, page["id"], page.get("url", ""), changes, False)))
+            else:
+                operations.append(("unchanged", ()))
+
+        # The rows created by the generator for the classes managed by the configuration that don't exist anymore are archived
+        for key, pages in pages_by_date.items():
+            if key[0] in managed_classes:
+                operations.extend(("archived", (page["id"], page.get("url", ""), recorded_rows[page["id"]])) for page in pages if page["id"] in recorded_rows)
+
+        return operations
+
+    def created(self, row: PlanNode, payload: dict, journal_prefix: str) -> None:
+        """POST a missing row
+        :param row: the row node
+        :param payload: the payload of the row with the references resolved
+        :param journal_prefix: the prefix of the keys in the journal
+        """
+        body = self.client.create_page(payload)
+        self.journal.record(journal_prefix + row.key, body["id"], body["url"], payload_hash(row.notion_payload()))
+
+    def updated(self, row: PlanNode, page_id: str, url: str, changes: dict, restore: bool, journal_prefix: str) -> None:
+        """PATCH the properties of a row that changed
+        :param row: the row node
+        :param page_id: the id of the existing row
+        :param url: the url of the existing row
+        :param changes: the properties to update
+        :param restore: True if the row was archived and must be restored
+        :param journal_prefix: the prefix of the keys in the journal
+        """
+        body = {"properties": changes}
+        if restore:
+            body["archived"] = False
+        self.client.patch(f"pages/{page_id}", json=body)
+        self.journal.record(journal_prefix + row.key, page_id, url, payload_hash(row.notion_payload()))
+
+    def archived(self, page_id: str, url: str, keys: list[str], journal_prefix: str) -> None:
+        """Archive a row that doesn't exist in the configuration anymore and record it in the journal (it is restored if its key comes back)
+        :param page_id: the id of the row
+        :param url: the url of the row
+        :param keys: the keys recorded in the journal for the row
+        :param journal_prefix: the prefix of the keys in the journal
+        """
+        self.client.patch(f"pages/{page_id}", json={"archived": True})
+        for key in keys:
+            self.journal.record(journal_prefix + key, page_id, url, ARCHIVED_HASH)
@@ -0,0 +1,101 @@
+import math
+import os
+import threading
+from dotenv import load_dotenv
+from utils.messages import logger
+
+
+# Time to live (in seconds) of the cached GET requests when NOTION_CACHE_TTL is not set (or not valid)
+DEFAULT_CACHE_TTL = 300
+
+
+def get_duration_env(name: str, default: float) -> float:
+    """Return a duration (in seconds) read from an environment variable, the default value if it isn't set
+    A value that isn't a positive number is ignored (with a warning) instead of stopping the app.
+    :param name: the name of the environment variable
+    :param default: the default duration
+    """
+
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+
+    try:
+        duration = float(value)
+    except ValueError:
+        duration = None
+
+    if duration is None or not math.isfinite(duration) or duration < 0:
+        logger.warning(f"{name}={value!r} is not a valid duration in seconds, {default} is used instead")
+        return default
+    return duration
+
+
+class ClientConfig:
+    """Class that holds the credentials and the settings of the Notion API, read once from the environment (and the .env file)"""
+
+    def __init__(self, api_key: str, notion_version: str = "2022-02-22", base_url: str = "https://api.notion.com/v1", admin_name: str = None, admin_surname: str = None, admin_email: str = None, cache_path: str = ".notion_cache.sqlite3", cache_ttl: float = DEFAULT_CACHE_TTL) -> None:
+        """Constructor of the ClientConfig class
+        :param api_key: the key of the Notion integration
+        :param notion_version: the version of the Notion API to use
+        :param base_url: the base url of the Notion API
+        :param admin_name: the name of the teacher, written on the page of each class
+        :param admin_surname: the surname of the teacher, written on the page of each class
+        :param admin_email: the email of the teacher, written on the page of each class
+        :param cache_path: the path of the file caching the GET requests of the shared client (no cache if empty)
+        :param cache_ttl: the time to live (in seconds) of the cached GET requests
+        """
+        self.api_key = api_key
+        self.notion_version = notion_version
+        self.base_url = base_url.rstrip("/")
+        self.admin_name = admin_name
+        self.admin_surname = admin_surname
+        self.admin_email = admin_email
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+
+        # Header of the HTTP requests
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Notion-Version": self.notion_version
+        }
+
+    def admin_info(self) -> dict:
+        """Return the teacher information written on the page of each class"""
+        return {"name": self.admin_name, "surname": self.admin_surname, "email": self.admin_email}
+
+    @staticmethod
+    def from_env() -> "ClientConfig":
+        """Create the configuration from the environment variables, after loading the .env file
+        The following variables are read: NOTION_API_KEY, NOTION_VERSION, NOTION_BASE_URL, ADMIN_NAME, ADMIN_SURNAME, ADMIN_EMAIL, NOTION_CACHE_PATH, NOTION_CACHE_TTL
+        """
+
+        # Load environment variables (Notion API Key and admin info)
+        load_dotenv()
+
+        return ClientConfig(
+            os.getenv("NOTION_API_KEY"),
+            os.getenv("NOTION_VERSION", "2022-02-22"),
+            os.getenv("NOTION_BASE_URL", "https://api.notion.com/v1"),
+            os.getenv("ADMIN_NAME"),
+            os.getenv("ADMIN_SURNAME"),
+            os.getenv("ADMIN_EMAIL"),
+            os.getenv("NOTION_CACHE_PATH", ".notion_cache.sqlite3"),
+            get_duration_env("NOTION_CACHE_TTL", DEFAULT_CACHE_TTL)
+        )
+
+
+# Configuration shared by all clients, pages and databases
+_client_config = None
+_client_config_lock = threading.Lock()
+
+
+def get_client_config() -> ClientConfig:
+    """Return the configuration shared by the whole app (the .env file is read on first use only)"""
+    global _client_config
+
+    with _client_config_lock:
+        if _client_config is None:
+            _client_config = ClientConfig.from_env()
+        return _client_config
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+
+
+class AdaptiveConcurrencyController:
+    """Class that adapts the number of requests in flight (additive increase, multiplicative decrease)"""
+
+    def __init__(self, initial_limit: float = 2, min_limit: float = 1, max_limit: float = 10, decrease_factor: float = 0.5,
+                 latency_threshold: float = 2.0, max_error_rate: float = 0.1, nb_samples: int = 100) -> None:
+        """Constructor of the AdaptiveConcurrencyController class
+        :param initial_limit: the number of requests allowed in flight at the beginning
+        :param min_limit: the minimum number of requests allowed in flight
+        :param max_limit: the maximum number of requests allowed in flight (should not exceed the pool size of the client)
+        :param decrease_factor: the factor applied to the limit on a 429, a timeout or too many errors
+        :param latency_threshold: the round trip time (in seconds) above which the latency is not healthy anymore
+        :param max_error_rate: the rate of 5xx/network errors among the recent requests above which the limit is decreased
+        :param nb_samples: the number of recent requests used to compute the RTT percentiles and the error rate
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_threshold = latency_threshold
+        self.max_error_rate = max_error_rate
+
+        # Recent round trip times and outcomes (True if the request failed)
+        self.rtts = deque(maxlen=nb_samples)
+        self.errors = deque(maxlen=nb_samples)
+
+        self.in_flight = 0
+        self.nb_increases = 0
+        self.nb_decreases = 0
+
+        # The limit is decreased at most once per round trip time, so that a burst of 429s only counts once
+        self.last_decrease = 0.0
+
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Wait until a new request is allowed to be sent"""
+
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def abandon(self) -> None:
+        """Give back a slot acquired for a request that was finally not sent (nothing is recorded)"""
+
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def release(self, rtt: float, outcome: str) -> None:
+        """Record the end of a request and adapt the limit
+        :param rtt: the round trip time of the request (in seconds)
+        :param outcome: can be one of the following: "success", "throttled" (429), "timeout", "error" (5xx or network error)
+        """
+
+        with self.condition:
+            self.in_flight -= 1
+            self.rtts.append(rtt)
+            self.errors.append(outcome != "success")
+
+            if outcome in ("throttled", "timeout") or self.error_rate() > self.max_error_rate:
+                self.decrease()
+            elif outcome == "success" and rtt <= self.latency_threshold:
+                # +1 request in flight once a full window of requests succeeded
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self.nb_increases += 1
+
+            self.condition.notify_all()
+
+    def decrease(self) -> None:
+        """Decrease the limit multiplicatively (at most once per round trip time)"""
+
+        now = time.monotonic()
+        if now - self.last_decrease >= self.percentile(50):
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self.nb_decreases += 1
+            self.last_decrease = now
+
+    def error_rate(self) -> float:
+        """Return the rate of failed requests among the recent requests"""
+        return sum(self.errors) / len(self.errors) if self.errors else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Return a percentile of the recent round trip times
+        :param percent: the percentile to compute (between 0 and 100)
+        """
+        if not self.rtts:
+            return 0.0
+        rtts = sorted(self.rtts)
+        return rtts[min(len(rtts) - 1, int(len(rtts) * percent / 100))]
+
+    def get_state(self) -> dict:
+        """Return the current window and the recent RTT percentiles"""
+
+        with self.condition:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "rtt_p50": self.percentile(50),
+                "rtt_p90": self.percentile(90),
+                "rtt_p99": self.percentile(99),
+                "error_rate": self.error_rate(),
+                "nb_increases": self.nb_increases,
+                "nb_decreases": self.nb_decreases
+            }
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import threading
+
+
+# Hash recorded for a row archived because it is not in the plan anymore
+ARCHIVED_HASH = "archived"
+
+
+def payload_hash(payload: dict) -> str:
+    """Return a stable hash of a payload (same hash for the same content, whatever the order of the keys)
+    :param payload: the payload to hash
+    """
+    normalised = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+def default_journal_path(config_file_path: str, root_page_id: str) -> str:
+    """Return the path of the journal of a root page when none is given: next to the configuration file,
+    so that the same journal is found whatever the directory the app or the CLI is run from
+    :param config_file_path: the path of the configuration file (the current directory is used if empty)
+    :param root_page_id: the id of the Notion root page
+    """
+    directory = os.path.dirname(os.path.abspath(config_file_path)) if config_file_path else os.getcwd()
+    return os.path.join(directory, f"journal_{root_page_id}.jsonl")
+
+
+class GenerationJournal:
+    """Class that records every creation done in Notion in an append-only JSON-lines file
+    Each line has the following format: {"key": str, "id": str, "url": str, "hash": str}
+    The entries of the pages also have a "content_hash" (hash of their children blocks), to know if only their properties changed.
+    The file is flushed to disk after each line, so that a run that dies halfway can be resumed.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Constructor of the GenerationJournal class, the entries already in the file are loaded
+        :param path: the path of the journal file
+        """
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+
+        if os.path.isfile(path):
+            with open(path, "r+b") as journal_file:
+                content = journal_file.read()
+
+                # The last line is incomplete if the program died while writing it: it is removed from the file,
+                # otherwise the next entry would be appended to it and couldn't be read anymore
+                complete_length = content.rfind(b"\n") + 1
+                if complete_length < len(content):
+                    journal_file.truncate(complete_length)
+
+            for line in content[:complete_length].decode("utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.entries[entry["key"]] = entry
+
+        self.journal_file = open(path, "a", encoding="utf-8")
+
+    def get(self, key: str) -> dict:
+        """Return the last entry recorded for a key, None if the key was never recorded
+        :param key: the logical key of the creation
+        """
+        return self.entries.get(key)
+
+    def record(self, key: str, notion_id: str, url: str, hash: str, content_hash: str = None) -> None:
+        """Record a creation and write it to disk
+        :param key: the logical key of the creation
+        :param notion_id: the id given by Notion
+        :param url: the url given by Notion
+        :param hash: the hash of the payload sent to Notion
+        :param content_hash: the hash of the children blocks of a page (not recorded if None)
+        """
+        entry = {"key": key, "id": notion_id, "url": url, "hash": hash}
+        if content_hash is not None:
+            entry["content_hash"] = content_hash
+
+        with self.lock:
+            self.entries[key] = entry
+            self.journal_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())
+
+    def close(self) -> None:
+        """Close the journal file"""
+        with self.lock:
+            self.journal_file.close()
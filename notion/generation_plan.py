@@ -0,0 +1,263 @@
+import datetime
+import json
+from typing import NamedTuple
+from config.config import Config
+from notion.notion_db import NotionDB
+from notion.notion_page import NotionPage
+from notion.row_record import RowRecord
+from utils.lesson_calendar import LessonCalendar
+
+
+# Key used in the payloads to refer to the root page given when the plan is executed
+ROOT_KEY = "$root"
+
+
+def ref_id(key: str) -> dict:
+    """Return a symbolic reference to the Notion id of a node, replaced by the real id when the plan is executed
+    :param key: the key of the node
+    """
+    return {"$id": key}
+
+
+def ref_url(key: str) -> dict:
+    """Return a symbolic reference to the Notion url of a node, replaced by the real url when the plan is executed
+    :param key: the key of the node
+    """
+    return {"$url": key}
+
+
+def find_references(value, references: set) -> set:
+    """Add to the given set the keys of all nodes referenced in a payload
+    :param value: the payload (or a part of it)
+    :param references: the set where the keys are added
+    """
+    if isinstance(value, dict):
+        if len(value) == 1 and ("$id" in value or "$url" in value):
+            references.add(value.get("$id", value.get("$url")))
+        else:
+            for element in value.values():
+                find_references(element, references)
+    elif isinstance(value, list):
+        for element in value:
+            find_references(element, references)
+    return references
+
+
+def resolve_references(value, ids: dict, urls: dict):
+    """Return a copy of a payload where every symbolic reference is replaced by the real id/url
+    :param value: the payload (or a part of it)
+    :param ids: the Notion id of each node key
+    :param urls: the Notion url of each node key
+    """
+    if isinstance(value, dict):
+        if len(value) == 1 and "$id" in value:
+            return ids[value["$id"]]
+        if len(value) == 1 and "$url" in value:
+            return urls[value["$url"]]
+        return {key: resolve_references(element, ids, urls) for key, element in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(element, ids, urls) for element in value]
+    return value
+
+
+class PlanNode(NamedTuple):
+    """One creation of the plan"""
+
+    # Unique logical key of the node (e.g. "page_year/1gy", "row/1gy1/12/1" for the first course of week 12)
+    key: str
+
+    # Can be one of the following:
+    #   - "page": POST /pages
+    #   - "database": POST /databases
+    #   - "row": POST /pages into a database
+    #   - "blocks": PATCH /blocks/{parent}/children
+    kind: str
+
+    # Key of the parent node (ROOT_KEY for the root page given at execution)
+    parent: str
+
+    # Body of the request, the ids/urls of other nodes are symbolic references ({"$id": key} or {"$url": key})
+    # The payload of a row is a RowRecord, converted to the Notion JSON format only when it is sent
+    payload: dict | RowRecord
+
+    # Keys of the nodes that must be created before this one, although they are not referenced (order of siblings in Notion)
+    after: tuple = ()
+
+    def dependencies(self) -> list:
+        """Return the keys of all nodes that must be created before this one"""
+
+        # A row only depends on its database
+        if self.kind == "row":
+            return [self.parent]
+
+        references = find_references(self.payload, set())
+        references.discard(ROOT_KEY)
+        return sorted(references) + [key for key in self.after if key not in references]
+
+    def notion_payload(self, ids: dict = None, urls: dict = None) -> dict:
+        """Return the body of the request in the Notion JSON format
+        The references are resolved if ids and urls are given, they are kept symbolic otherwise.
+        :param ids: the Notion id of each node key
+        :param urls: the Notion url of each node key
+        """
+
+        if self.kind == "row":
+            return self.payload.to_page_dict(ids[self.parent] if ids is not None else ref_id(self.parent))
+
+        return resolve_references(self.payload, ids, urls) if ids is not None else self.payload
+
+
+class GenerationPlan:
+    """Class that holds every page, database, row and block to create for a configuration, without any network access
+    The plan must not be modified once compiled: executors copy the payloads when they resolve the references.
+    """
+
+    def __init__(self, nodes: tuple, school_year: str) -> None:
+        """Constructor of the GenerationPlan class
+        :param nodes: the nodes of the plan, each node comes after the nodes it depends on
+        :param school_year: the school year of the plan (e.g. 2024-2025)
+        """
+        self.nodes = tuple(nodes)
+        self.school_year = school_year
+        self.nodes_by_key = {node.key: node for node in self.nodes}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def to_dict(self) -> dict:
+        """Return the plan as a dict that can be serialised in JSON (the rows are stored as lists of values)"""
+        return {
+            "school_year": self.school_year,
+            "nodes": [node._replace(payload=node.payload.to_list())._asdict() if node.kind == "row" else node._asdict() for node in self.nodes]
+        }
+
+    @staticmethod
+    def from_dict(plan_dict: dict) -> "GenerationPlan":
+        """Create a plan from a dict returned by to_dict
+        :param plan_dict: the dict of the plan
+        """
+        nodes = [
+            PlanNode(node["key"], node["kind"], node["parent"], RowRecord.from_list(node["payload"]) if node["kind"] == "row" else node["payload"], tuple(node["after"]))
+            for node in plan_dict["nodes"]
+        ]
+        return GenerationPlan(nodes, plan_dict["school_year"])
+
+    def save(self, path: str) -> None:
+        """Save the plan in a JSON file
+        :param path: the path of the file
+        """
+        with open(path, "w", encoding="utf-8") as plan_file:
+            json.dump(self.to_dict(), plan_file, ensure_ascii=False)
+
+    @staticmethod
+    def load(path: str) -> "GenerationPlan":
+        """Load a plan from a JSON file
+        :param path: the path of the file
+        """
+        with open(path, "r", encoding="utf-8") as plan_file:
+            return GenerationPlan.from_dict(json.load(plan_file))
+
+    @staticmethod
+    def compile(config: Config, admin_info: dict) -> "GenerationPlan":
+        """Compile a configuration into a plan (same pages, databases and rows as create_pages_from_config)
+        Compiling doesn't read the environment nor create a client: the pages and databases are only built.
+        :param config: the configuration
+        :param admin_info: the teacher information written on the page of each class (see ClientConfig.admin_info)
+        """
+
+        # Get the configuration dictionary
+        config_dict = config.config
+
+        # Year interval: 2023-2024
+        # Short year interval: 23-24
+        current_year_interval = f"{datetime.datetime.now().year}-{int(datetime.datetime.now().year)+1}"
+        short_current_year_interval = f"{str(datetime.datetime.now().year)[2:]}-{str(int(datetime.datetime.now().year)+1)[2:]}"
+
+        nodes = []
+
+        # Lessons of every class that is not empty, computed by a single calendar for the whole plan (each date is formatted once for all classes)
+        # The calendar needs the dates of the school year, which are not filled in while no class has students
+        has_students = any(class_info["nb_eleves"] != 0 for niveau in config_dict["niveaux"].values() for annee in niveau.values() for class_info in annee["classes"].values())
+        lessons_by_class = LessonCalendar(config_dict).lessons_for_all_classes() if has_students else {}
+
+        def add_page(key: str, page: NotionPage, parent: str, after: tuple = ()) -> None:
+            """Add a page node whose parent is another page"""
+            page.set_parent(ref_id(parent))
+            nodes.append(PlanNode(key, "page", parent, page.page_dict, after))
+
+        # Page with general info
+        page_general_info = NotionPage(page_title=f"Année {current_year_interval}")
+        page_general_info.add_heading(2, "Informations générales")
+        add_page("page_general_info", page_general_info, ROOT_KEY)
+
+        # Page with all JupyterHub accounts
+        page_jupyterhub = NotionPage(page_title=f"Liste des comptes JupyterHub de tous les étudiants [{short_current_year_interval}]", emoji="🤓")
+        page_jupyterhub.add_paragraph("Vous trouverez ci-dessous votre nom d'utilisateur pour accéder à")
+        page_jupyterhub.add_paragraph("la plateforme JupyterHub", url="https://jupyterhub.informatique-csud.ch", new_paragraph=False)
+        page_jupyterhub.add_paragraph("qui sera utilisée toute l'année pour apprendre la programmation Python")
+        add_page("page_jupyterhub", page_jupyterhub, "page_general_info")
+
+        # Page for exams retaking
+        page_exam_retaking = NotionPage(page_title=f"Rattrapages examens [{short_current_year_interval}]", emoji="📄")
+        page_exam_retaking.add_table([["Classe", "Elève", "Date rattrapage", "Etat"], [" ", " ", " ", " "], [" ", " ", " ", " "], [" ", " ", " ", " "]])
+        add_page("page_exam_retaking", page_exam_retaking, "page_general_info", ("page_jupyterhub",))
+
+        # Page for the schedule
+        schedule_page = NotionPage(page_title=f"Horaires [{short_current_year_interval}]", emoji="📆")
+        add_page("schedule_page", schedule_page, "page_general_info", ("page_exam_retaking",))
+
+        # Page for the maturity work
+        tm_page = NotionPage(page_title=f"Travaux de maturité [{short_current_year_interval}]", emoji="📄")
+        tm_page.add_heading(2, "Sujet")
+        tm_page.add_paragraph("Description du sujet à ajouter ici")
+        tm_page.add_heading(2, "Calendrier des séances/échéances")
+        add_page("tm_page", tm_page, "page_general_info", ("schedule_page",))
+
+        # Last node adding content into page_general_info (headings and year pages must keep their order)
+        previous_general_info_child = "tm_page"
+
+        # Go through the configuration file and plan the pages/database for each program (1gy, 2gy, 1ecg, 2ecg, 1ec, 2ec)
+        for niveau in config_dict['niveaux']:
+
+            # Heading appended to page_general_info
+            heading = NotionPage()
+            heading.add_heading(2, f"{niveau.capitalize()}")
+            nodes.append(PlanNode(f"heading/{niveau}", "blocks", "page_general_info", {"block_id": ref_id("page_general_info"), "children": heading.page_dict["children"]}, (previous_general_info_child,)))
+            previous_general_info_child = f"heading/{niveau}"
+
+            for annee in config_dict['niveaux'][niveau]:
+
+                # Page for each year
+                page_year = NotionPage(page_title=f"{annee.upper()} [{short_current_year_interval}]")
+                add_page(f"page_year/{annee}", page_year, "page_general_info", (previous_general_info_child,))
+                previous_general_info_child = f"page_year/{annee}"
+
+                # Database for each year
+                database_for_a_specic_year = NotionDB(db_title=f"{annee.upper()} - Calendrier des cours [{short_current_year_interval}]", db_emoji="📆")
+                database_for_a_specic_year.add_columns_for_class(annee)
+                database_for_a_specic_year.set_parent_page(ref_id(f"page_year/{annee}"))
+                nodes.append(PlanNode(f"database/{annee}", "database", f"page_year/{annee}", database_for_a_specic_year.db_dict))
+
+                # Last node adding content into page_year (the database comes first, then the class pages)
+                previous_year_child = f"database/{annee}"
+
+                # Pages for each class in each year
+                for classe in config_dict['niveaux'][niveau][annee]["classes"]:
+
+                        # Check that the class is not empty
+                        if not config_dict['niveaux'][niveau][annee]["classes"][classe]["nb_eleves"] == 0:
+                            # All rows for a class in the database
+                            # The key of a row is its week and its course, so that a lesson keeps its row when another course is added or removed
+                            for row_key, row in database_for_a_specic_year.build_keyed_rows(classe, lessons_by_class[(annee, classe)]):
+                                nodes.append(PlanNode(f"row/{classe}/{row_key}", "row", f"database/{annee}", row))
+
+                            # Page for a class
+                            title = "Cours d'informatique" if niveau in ["gymnase", "ecg"] else ""
+                            class_info = config_dict['niveaux'][niveau][annee]["classes"][classe]
+                            general_info = config_dict['niveaux'][niveau][annee]["infos_generales"]
+                            page = NotionPage(page_title=f"{classe.upper()} - {title} [{short_current_year_interval}]", emoji="💻")
+                            page.create_page_for_a_class(class_info, general_info, ref_url("page_jupyterhub"), admin_info)
+                            add_page(f"page_class/{classe}", page, f"page_year/{annee}", (previous_year_child,))
+                            previous_year_child = f"page_class/{classe}"
+
+        return GenerationPlan(nodes, current_year_interval)
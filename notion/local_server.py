@@ -0,0 +1,403 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from notion.notion_client import MAX_CHILDREN_PER_REQUEST
+
+
+# Distributions of the latency added to each answer, given the mean latency (in seconds)
+LATENCY_DISTRIBUTIONS = {
+    "constant": lambda generator, mean: mean,
+    "uniform": lambda generator, mean: generator.uniform(0, 2 * mean),
+    "exponential": lambda generator, mean: generator.expovariate(1 / mean) if mean > 0 else 0,
+    "lognormal": lambda generator, mean: mean * generator.lognormvariate(0, 0.5) / 1.1331484530668263,
+}
+
+
+class NotionError(Exception):
+    """Exception raised by the local server to answer with a Notion error object"""
+
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class LocalNotionServer:
+    """Class that runs a local stand-in of the Notion API, to run the generator without network and measure its throughput
+    Only the endpoints used by the app are implemented: pages, databases, database query and block children.
+    Latency, rate limiting (429 with Retry-After) and server errors (5xx) can be injected.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "constant", latency_mean: float = 0, rate_limited_ratio: float = 0, retry_after: float = 1, server_error_ratio: float = 0, seed: int = None, root_page_id: str = None) -> None:
+        """Constructor of the LocalNotionServer class
+        :param host: the host the server listens on
+        :param port: the port the server listens on (a free port is chosen if 0)
+        :param latency: the distribution of the latency, can be one of the following: "constant", "uniform", "exponential", "lognormal"
+        :param latency_mean: the mean latency (in seconds) added to each answer
+        :param rate_limited_ratio: the ratio of requests answered with a 429 error
+        :param retry_after: the value (in seconds) of the Retry-After header of the 429 errors
+        :param server_error_ratio: the ratio of requests answered with a 5xx error
+        :param seed: the seed of the random generator (latency and errors), to reproduce a run
+        :param root_page_id: the id of the root page created at startup, under which a calendar can be generated (a random id if None)
+        """
+
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.rate_limited_ratio = rate_limited_ratio
+        self.retry_after = retry_after
+        self.server_error_ratio = server_error_ratio
+        self.generator = random.Random(seed)
+        self.lock = threading.Lock()
+
+        # Objects stored by the server
+        self.pages = {}
+        self.databases = {}
+        self.children = {}
+
+        # Page shared with the integration, to give as root page to the generator
+        self.root_page_id = self.create_root_page(root_page_id or str(uuid.uuid4()))
+
+        # Number of requests received by method, and number of errors injected
+        self.stats = {"GET": 0, "POST": 0, "PATCH": 0, "rate_limited": 0, "server_errors": 0}
+
+        self.server = ThreadingHTTPServer((host, port), self.create_handler())
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Return the base url to give to the Notion client (NOTION_BASE_URL)"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "LocalNotionServer":
+        """Start the server in a background thread"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server"""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def create_handler(self) -> type:
+        """Return the class handling the HTTP requests of this server"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self.answer("GET")
+
+            def do_POST(self) -> None:
+                self.answer("POST")
+
+            def do_PATCH(self) -> None:
+                self.answer("PATCH")
+
+            def answer(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                url = urlparse(self.path)
+
+                status, body, headers = server.handle(method, url.path, parse_qs(url.query), raw_body)
+
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
+
+    def handle(self, method: str, path: str, query: dict, raw_body: bytes) -> tuple[int, dict, dict]:
+        """Return the status, the body and the headers of the answer to a request
+        :param method: the HTTP method
+        :param path: the path of the url (e.g. /v1/pages)
+        :param query: the parameters of the query string
+        :param raw_body: the body of the request
+        """
+
+        with self.lock:
+            self.stats[method] = self.stats.get(method, 0) + 1
+            delay = LATENCY_DISTRIBUTIONS[self.latency](self.generator, self.latency_mean)
+            draw = self.generator.random()
+
+        time.sleep(delay)
+
+        # Injected errors
+        if draw < self.rate_limited_ratio:
+            with self.lock:
+                self.stats["rate_limited"] += 1
+            return 429, error_object(429, "rate_limited", "You have been rate limited. Please try again in a few minutes."), {"Retry-After": str(self.retry_after)}
+        if draw < self.rate_limited_ratio + self.server_error_ratio:
+            with self.lock:
+                self.stats["server_errors"] += 1
+            return 503, error_object(503, "service_unavailable", "Notion is unavailable, please try again later."), {}
+
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            parts = path.strip("/").split("/")[1:]
+            with self.lock:
+                return 200, self.route(method, parts, query, body), {}
+        except NotionError as error:
+            return error.status, error_object(error.status, error.code, error.message), {}
+        except (ValueError, KeyError, TypeError) as error:
+            return 400, error_object(400, "validation_error", f"{error}"), {}
+
+    def route(self, method: str, parts: list, query: dict, body: dict) -> dict:
+        """Call the endpoint matching the request (the lock must be held)
+        :param method: the HTTP method
+        :param parts: the parts of the path after the version (e.g. ["pages", id])
+        :param query: the parameters of the query string
+        :param body: the body of the request
+        """
+
+        match method, parts:
+            case "POST", ["pages"]:
+                return self.create_page(body)
+            case "GET", ["pages", page_id]:
+                return self.get_object(self.pages, page_id)
+            case "PATCH", ["pages", page_id]:
+                return self.update_page(page_id, body)
+            case "POST", ["databases"]:
+                return self.create_database(body)
+            case "GET", ["databases", database_id]:
+                return self.get_object(self.databases, database_id)
+            case "PATCH", ["databases", database_id]:
+                self.get_object(self.databases, database_id).update({key: value for key, value in body.items() if key in ("title", "description", "properties", "icon")})
+                return self.databases[database_id]
+            case "POST", ["databases", database_id, "query"]:
+                return self.query_database(database_id, body)
+            case "GET", ["blocks", block_id, "children"]:
+                return paginate(self.children.get(block_id, []), query.get("start_cursor", [None])[0], int(query.get("page_size", ["100"])[0]))
+            case "PATCH", ["blocks", block_id, "children"]:
+                blocks = self.store_blocks(body["children"])
+                self.children.setdefault(block_id, []).extend(blocks)
+                return {"object": "list", "results": blocks, "next_cursor": None, "has_more": False}
+            case _:
+                raise NotionError(400, "invalid_request_url", f"Invalid request URL: {method} /{'/'.join(parts)}")
+
+    def get_object(self, objects: dict, object_id: str) -> dict:
+        """Return a page or a database, raise a 404 error if it doesn't exist"""
+        if object_id not in objects:
+            raise NotionError(404, "object_not_found", f"Could not find object with ID: {object_id}.")
+        return objects[object_id]
+
+    def create_root_page(self, page_id: str) -> str:
+        """Create an empty page at the root of the workspace and return its id
+        :param page_id: the id of the page (36 characters, as the ids of Notion)
+        """
+
+        if len(page_id) != 36:
+            raise ValueError(f"{page_id} is not a Notion page id (36 characters expected)")
+
+        self.pages[page_id] = {"object": "page", "id": page_id, "url": f"https://www.notion.so/{page_id.replace('-', '')}", "parent": {"type": "workspace", "workspace": True}, "archived": False,
+                               "properties": {"title": {"id": "title", "type": "title", "title": with_plain_text([{"type": "text", "text": {"content": "Calendrier"}}])}}, "icon": None}
+        self.children[page_id] = []
+        return page_id
+
+    def create_page(self, body: dict) -> dict:
+        """POST /pages: create a page (or a row if the parent is a database) with its children"""
+
+        page_id = str(uuid.uuid4())
+        parent = body["parent"]
+        properties = body.get("properties", {})
+        if "database_id" in parent:
+            properties = self.typed_properties(self.get_object(self.databases, parent["database_id"]), properties)
+        else:
+            properties = {"title": {"id": "title", "type": "title", "title": with_plain_text(properties.get("title", []))}}
+
+        page = {"object": "page", "id": page_id, "url": f"https://www.notion.so/{page_id.replace('-', '')}", "parent": parent, "archived": False, "properties": properties, "icon": body.get("icon")}
+        self.pages[page_id] = page
+        self.children[page_id] = self.store_blocks(body.get("children", []))
+
+        if "page_id" in parent:
+            self.children.setdefault(parent["page_id"], []).append(child_block("child_page", page_id, {"title": properties["title"]["title"][0]["plain_text"] if properties["title"]["title"] else ""}))
+
+        return page
+
+    def update_page(self, page_id: str, body: dict) -> dict:
+        """PATCH /pages/{id}: update the properties, the icon or the archived state of a page"""
+
+        page = self.get_object(self.pages, page_id)
+        if "properties" in body:
+            if "database_id" in page["parent"]:
+                page["properties"].update(self.typed_properties(self.databases[page["parent"]["database_id"]], body["properties"]))
+            elif "title" in body["properties"]:
+                page["properties"]["title"]["title"] = with_plain_text(body["properties"]["title"])
+        for key in ("icon", "archived"):
+            if key in body:
+                page[key] = body[key]
+
+        return page
+
+    def create_database(self, body: dict) -> dict:
+        """POST /databases: create a database under a page"""
+
+        database_id = str(uuid.uuid4())
+        properties = {name: {"id": name, "name": name, "type": column.get("type", next(iter(column))), **column} for name, column in body["properties"].items()}
+        database = {"object": "database", "id": database_id, "url": f"https://www.notion.so/{database_id.replace('-', '')}", "parent": body["parent"],
+                    "title": body.get("title", []), "description": body.get("description", []), "properties": properties, "icon": body.get("icon")}
+        self.databases[database_id] = database
+        self.children.setdefault(body["parent"]["page_id"], []).append(child_block("child_database", database_id, {"title": ""}))
+
+        return database
+
+    def query_database(self, database_id: str, body: dict) -> dict:
+        """POST /databases/{id}/query: return the rows (not archived) matching the filter, in the order of creation"""
+
+        self.get_object(self.databases, database_id)
+        rows = [page for page in self.pages.values() if page["parent"].get("database_id") == database_id and not page["archived"]]
+        if body.get("filter"):
+            rows = [row for row in rows if matches_filter(row, body["filter"])]
+
+        return paginate(rows, body.get("start_cursor"), body.get("page_size", 100))
+
+    def typed_properties(self, database: dict, properties: dict) -> dict:
+        """Return the properties of a row in the format returned by Notion ({"id", "type", type: value})
+        :param database: the database of the row
+        :param properties: the properties sent (the title can be sent with the "title" key)
+        """
+
+        title_column = next(name for name, column in database["properties"].items() if column["type"] == "title")
+        typed = {}
+        for name, value in properties.items():
+            name = title_column if name == "title" else name
+            if name not in database["properties"]:
+                raise NotionError(400, "validation_error", f"{name} is not a property that exists.")
+            property_type = database["properties"][name]["type"]
+            typed[name] = {"id": name, "type": property_type, property_type: with_plain_text(value) if property_type in ("title", "rich_text") else value}
+
+        return typed
+
+    def store_blocks(self, blocks: list) -> list:
+        """Give an id to each block (and its nested children) and return the blocks as returned by Notion
+        :param blocks: the blocks sent
+        """
+
+        if len(blocks) > MAX_CHILDREN_PER_REQUEST:
+            raise NotionError(400, "validation_error", f"body.children.length should be ≤ {MAX_CHILDREN_PER_REQUEST}, instead was {len(blocks)}.")
+
+        stored = []
+        for block in blocks:
+            block_type = block.get("type") or next(key for key in block if key not in ("object", "type"))
+            content = dict(block[block_type])
+            nested_children = content.pop("children", [])
+
+            block_id = str(uuid.uuid4())
+            stored.append({"object": "block", "id": block_id, "type": block_type, "has_children": bool(nested_children), block_type: content})
+            if nested_children:
+                self.children[block_id] = self.store_blocks(nested_children)
+
+        return stored
+
+
+def error_object(status: int, code: str, message: str) -> dict:
+    """Return a Notion error object"""
+    return {"object": "error", "status": status, "code": code, "message": message}
+
+
+def child_block(block_type: str, object_id: str, content: dict) -> dict:
+    """Return the block of a child page or database, added to the content of its parent"""
+    return {"object": "block", "id": object_id, "type": block_type, "has_children": True, block_type: content}
+
+
+def with_plain_text(rich_text: list) -> list:
+    """Return rich text items with their plain_text, as returned by Notion"""
+    return [{**item, "plain_text": item.get("text", {}).get("content", "")} for item in rich_text]
+
+
+def paginate(results: list, start_cursor: str, page_size: int) -> dict:
+    """Return one page of a list of results, the cursor is the index of the next result
+    :param results: all results
+    :param start_cursor: the cursor returned by the previous page (first page if None)
+    :param page_size: the number of results per page (at most 100)
+    """
+    start = int(start_cursor) if start_cursor else 0
+    end = start + min(page_size, 100)
+    has_more = end < len(results)
+    return {"object": "list", "results": results[start:end], "next_cursor": str(end) if has_more else None, "has_more": has_more}
+
+
+def matches_filter(row: dict, filter: dict) -> bool:
+    """Return True if a row matches a filter of a database query
+    Only the compound "and"/"or" filters and the "equals"/"contains" conditions are supported.
+    :param row: the row (page)
+    :param filter: the filter of the query
+    """
+
+    if "and" in filter:
+        return all(matches_filter(row, condition) for condition in filter["and"])
+    if "or" in filter:
+        return any(matches_filter(row, condition) for condition in filter["or"])
+
+    value = row["properties"].get(filter["property"])
+    property_type = next(key for key in filter if key != "property")
+    condition = filter[property_type]
+    value = value[value["type"]] if value else None
+
+    match property_type:
+        case "select":
+            actual = value["name"] if value else None
+        case "multi_select":
+            actual = [option["name"] for option in value or []]
+        case "date":
+            actual = value["start"] if value else None
+        case "title" | "rich_text":
+            actual = "".join(text["plain_text"] for text in value or [])
+        case _:
+            actual = value
+
+    if "equals" in condition:
+        return actual == condition["equals"]
+    if "contains" in condition:
+        return condition["contains"] in actual if actual is not None else False
+    raise NotionError(400, "validation_error", f"Unsupported filter condition: {list(condition)}")
+
+
+def main() -> None:
+    """Run the local server until it is interrupted"""
+
+    parser = argparse.ArgumentParser(description="Local stand-in of the Notion API (set NOTION_BASE_URL to the url printed to use it)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", choices=list(LATENCY_DISTRIBUTIONS), default="constant")
+    parser.add_argument("--latency-mean", type=float, default=0, help="mean latency of each answer, in seconds")
+    parser.add_argument("--rate-limited-ratio", type=float, default=0, help="ratio of requests answered with a 429 error")
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After of the 429 errors, in seconds")
+    parser.add_argument("--server-error-ratio", type=float, default=0, help="ratio of requests answered with a 5xx error")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--root-page-id", default=None, help="id of the root page created at startup (a random id if not given)")
+    args = parser.parse_args()
+
+    server = LocalNotionServer(args.host, args.port, args.latency, args.latency_mean, args.rate_limited_ratio, args.retry_after, args.server_error_ratio, args.seed, args.root_page_id)
+    print(f"Local Notion API listening on {server.base_url}")
+    print(f"Root page id: {server.root_page_id}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+        print(server.stats)
+
+
+if __name__ == "__main__":
+    main()
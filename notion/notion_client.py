@@ -0,0 +1,267 @@
+import atexit
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from notion.client_config import ClientConfig, get_client_config
+from notion.concurrency_controller import AdaptiveConcurrencyController
+from notion.request_scheduler import RequestCancelled, RequestScheduler, check_cancelled
+from notion.response_cache import NOTION_ID_PATTERN, ResponseCache
+
+
+# Maximum number of children blocks that Notion accepts in a single request
+MAX_CHILDREN_PER_REQUEST = 100
+
+
+class NotionAPIError(Exception):
+    """Exception raised when the Notion API answers with an error status code"""
+
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(f"Notion API error {status} ({code}): {message}")
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class NotionClient:
+    """Class that sends the HTTP requests to the Notion API through a pooled keep-alive session"""
+
+    def __init__(self, pool_size: int = 10, timeout: float = 20, base_url: str = None, notion_version: str = None, scheduler: RequestScheduler = None, controller: AdaptiveConcurrencyController = None, config: ClientConfig = None, cache: ResponseCache = None) -> None:
+        """Constructor of the NotionClient class
+        :param pool_size: the maximum number of connections kept alive in the pool
+        :param timeout: the default timeout (in seconds) of each request
+        :param base_url: the base url of the Notion API (the one of the configuration if None)
+        :param notion_version: the version of the Notion API to use (the one of the configuration if None)
+        :param scheduler: the scheduler that rate limits and retries the requests (a new one is created if None)
+        :param controller: the controller that adapts the number of requests in flight (a new one is created if None)
+        :param config: the credentials and settings of the Notion API (the shared configuration is used if None)
+        :param cache: the cache of the answers of the GET requests (nothing is cached if None)
+        """
+        # Credentials and settings, loaded once for the whole app
+        self.config = config if config is not None else get_client_config()
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.base_url = (base_url if base_url is not None else self.config.base_url).rstrip("/")
+
+        # Every request goes through the scheduler (rate limit, Retry-After and backoff)
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+
+        # The number of requests in flight is adapted to the latency and the errors (never more than the pool size)
+        self.controller = controller if controller is not None else AdaptiveConcurrencyController(max_limit=pool_size)
+
+        # Answers of the GET requests, invalidated when the ids they contain are written
+        self.cache = cache
+
+        # Event set to cancel the current run: the requests not sent yet (waiting for a token, a retry or a slot) raise a RequestCancelled
+        self.cancel_event = None
+
+        # Header of the HTTP requests
+        self.headers = dict(self.config.headers)
+        if notion_version is not None:
+            self.headers["Notion-Version"] = notion_version
+
+        # Session whose connections are reused between requests (one TLS handshake per pooled connection)
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def request(self, method: str, path: str, json: dict = None, timeout: float = None) -> requests.Response:
+        """Send a request to the Notion API, raise a NotionAPIError if the final answer is an error
+        :param method: the HTTP method (GET, POST, PATCH)
+        :param path: the path of the endpoint relative to the base url (e.g. "pages" or "blocks/{id}/children")
+        :param json: the body of the request
+        :param timeout: the timeout of this request, the default timeout of the client is used if None
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        timeout = timeout if timeout is not None else self.timeout
+
+        # Stop at the request boundary when the run has been cancelled
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise RequestCancelled(f"{method} {path} not sent: the run has been cancelled")
+
+        # Answer served locally if the same GET was sent recently
+        if method == "GET" and self.cache is not None:
+            body = self.cache.get(url, self.headers["Notion-Version"])
+            if body is not None:
+                return cached_response(url, body)
+
+        cancel_event = self.cancel_event
+        res = self.scheduler.send(lambda: self.send_once(method, url, json, timeout, cancel_event), cancel_event)
+
+        if res.status_code >= 400:
+            try:
+                body = res.json()
+            except ValueError:
+                body = {}
+            raise NotionAPIError(res.status_code, body.get("code", ""), body.get("message", res.reason))
+
+        if self.cache is not None:
+            if method == "GET":
+                self.cache.put(url, self.headers["Notion-Version"], res.content)
+            else:
+                self.invalidate_written_ids(path, json)
+
+        return res
+
+    def invalidate_written_ids(self, path: str, json: dict) -> None:
+        """Drop from the cache the answers that a write may have changed: the ids of the path and the parent of a new page or database
+        :param path: the path of the endpoint written
+        :param json: the body of the request
+        """
+
+        for notion_id in NOTION_ID_PATTERN.findall(path):
+            self.cache.invalidate(notion_id)
+
+        parent = (json or {}).get("parent")
+        if isinstance(parent, dict) and isinstance(parent.get(parent.get("type")), str):
+            self.cache.invalidate(parent[parent["type"]])
+
+    def send_once(self, method: str, url: str, json: dict, timeout: float, cancel_event: threading.Event = None) -> requests.Response:
+        """Send a single attempt of a request once the adaptive controller allows it, and report its outcome
+        :param method: the HTTP method
+        :param url: the full url of the endpoint
+        :param json: the body of the request
+        :param timeout: the timeout of the request
+        :param cancel_event: the event set to cancel the run, checked right before the request is sent
+        """
+
+        self.controller.acquire()
+        try:
+            check_cancelled(cancel_event)
+        except RequestCancelled:
+            self.controller.abandon()
+            raise
+
+        start = time.monotonic()
+        try:
+            res = self.session.request(method, url, json=json, timeout=timeout)
+        except requests.Timeout:
+            self.controller.release(time.monotonic() - start, "timeout")
+            raise
+        except requests.RequestException:
+            self.controller.release(time.monotonic() - start, "error")
+            raise
+
+        if res.status_code == 429:
+            outcome = "throttled"
+        elif res.status_code >= 500:
+            outcome = "error"
+        else:
+            outcome = "success"
+        self.controller.release(time.monotonic() - start, outcome)
+
+        return res
+
+    def get(self, path: str, timeout: float = None) -> requests.Response:
+        """GET a Notion API endpoint
+        :param path: the path of the endpoint relative to the base url
+        :param timeout: the timeout of this request
+        """
+        return self.request("GET", path, timeout=timeout)
+
+    def post(self, path: str, json: dict, timeout: float = None) -> requests.Response:
+        """POST a Notion API endpoint
+        :param path: the path of the endpoint relative to the base url
+        :param json: the body of the request
+        :param timeout: the timeout of this request
+        """
+        return self.request("POST", path, json=json, timeout=timeout)
+
+    def patch(self, path: str, json: dict, timeout: float = None) -> requests.Response:
+        """PATCH a Notion API endpoint
+        :param path: the path of the endpoint relative to the base url
+        :param json: the body of the request
+        :param timeout: the timeout of this request
+        """
+        return self.request("PATCH", path, json=json, timeout=timeout)
+
+    def create_page(self, page_dict: dict) -> dict:
+        """Create a page (or a row of a database) with its content in a single request when possible
+        The first MAX_CHILDREN_PER_REQUEST children are sent in the body of the POST, the other ones are appended afterwards.
+        Return the page created by Notion.
+        :param page_dict: the page to create (parent, properties, children, icon)
+        """
+
+        children = page_dict.get("children", [])
+        if len(children) <= MAX_CHILDREN_PER_REQUEST:
+            return self.post("pages", json=page_dict).json()
+
+        page = self.post("pages", json={**page_dict, "children": children[:MAX_CHILDREN_PER_REQUEST]}).json()
+        self.append_block_children(page["id"], children[MAX_CHILDREN_PER_REQUEST:])
+
+        return page
+
+    def append_block_children(self, block_id: str, children: list) -> list:
+        """Append children blocks to a block (or a page) with as few requests as possible, i.e. in chunks of MAX_CHILDREN_PER_REQUEST
+        Return the blocks created by Notion, in the same order as the children.
+        :param block_id: the id of the block (or the page)
+        :param children: the children blocks to append
+        """
+
+        results = []
+        for start in range(0, len(children), MAX_CHILDREN_PER_REQUEST):
+            res = self.patch(f"blocks/{block_id}/children", json={"children": children[start:start + MAX_CHILDREN_PER_REQUEST]})
+            results.extend(res.json()["results"])
+
+        return results
+
+    def get_stats(self) -> dict:
+        """Return the pool size, the default timeout, the connection reuse counters, the scheduler statistics and the concurrency state of the client"""
+
+        # Each urllib3 pool counts the connections it opened and the requests it sent
+        connections_opened = 0
+        requests_sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections_opened += pool.num_connections
+                requests_sent += pool.num_requests
+
+        return {
+            "pool_size": self.pool_size,
+            "timeout": self.timeout,
+            "requests_sent": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": requests_sent - connections_opened,
+            **self.scheduler.get_stats(),
+            **(self.cache.get_stats() if self.cache is not None else {}),
+            "concurrency": self.controller.get_state()
+        }
+
+
+def cached_response(url: str, body: bytes) -> requests.Response:
+    """Return a response built from a body served by the cache
+    :param url: the full url of the request
+    :param body: the cached body of the answer
+    """
+    res = requests.Response()
+    res.status_code = 200
+    res.url = url
+    res._content = body
+    res.headers["Content-Type"] = "application/json"
+    return res
+
+
+# Client shared by all pages and databases when no client is given
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> NotionClient:
+    """Return the Notion client shared by all pages and databases (created on first use)"""
+    global _default_client
+
+    with _default_client_lock:
+        if _default_client is None:
+            config = get_client_config()
+            cache = ResponseCache(config.cache_path, config.cache_ttl, api_key=config.api_key or "") if config.cache_path else None
+            _default_client = NotionClient(cache=cache)
+
+            # The order of use of the entries is saved when the app exits
+            if cache is not None:
+                atexit.register(cache.close)
+        return _default_client
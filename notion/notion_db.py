@@ -1,29 +1,31 @@
 import datetime
-import os
 import pprint
-import requests
 import sys
-from dotenv import load_dotenv
+from typing import Iterator
 from notion import notion_page
+from notion.notion_client import NotionClient, get_default_client
+from notion.paginator import iter_results
+from notion.row_encoder import RowEncoder
+from notion.row_inserter import RowInserter
+from notion.row_record import ROW_COLUMNS, RowRecord
+from notion.row_table import INDEXED_COLUMNS, RowTable
 from config.config import Config
-from utils.utils import day_to_value, date_to_course_duration, date_is_holiday
-import math
+from utils.lesson_calendar import Lesson, LessonCalendar
 
 
 class NotionDB:
     """Class to create a Notion database with the given title, description and emoji."""
 
-    def __init__(self,  db_id: str = "", page_parent_id: str = "", db_title: str = "", db_description: str = "Ce programme de cours présente une liste hebdomadaire exhaustive des sujets, lectures, devoirs et examens.", db_emoji: str = "🗓") -> None:
-        # Load environment variables (Notion API Key)
-        load_dotenv()
-        self.NOTION_API_KEY = os.getenv("NOTION_API_KEY")
+    def __init__(self,  db_id: str = "", page_parent_id: str = "", db_title: str = "", db_description: str = "Ce programme de cours présente une liste hebdomadaire exhaustive des sujets, lectures, devoirs et examens.", db_emoji: str = "🗓", client: NotionClient = None, max_rows_in_flight: int = None) -> None:
+        # Client that sends the HTTP requests through a shared connection pool (the shared client is only created when a request is sent)
+        self._client = client
 
-        # Header of the HTTP request
-        self.headers = {
-            "Authorization": f"Bearer {self.NOTION_API_KEY}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-02-22"
-        }
+        # Maximum number of rows inserted at the same time by add_all_rows_for_a_class
+        # By default (None), as many as the pool allows: the adaptive controller of the client decides how many are really sent
+        self.max_rows_in_flight = max_rows_in_flight
+
+        # Row encoders compiled for this database, by columns of the rows (see row_encoder)
+        self.row_encoders = {}
 
         # If we locally create the db
         if db_id == "":
@@ -62,6 +64,26 @@ class NotionDB:
             # Database id that will be set after the db is saved to Notion
             self.db_id = ""
 
+        # If the db already exists in Notion
+        else:
+            self.db_id = db_id
+
+    @property
+    def client(self) -> NotionClient:
+        """Return the client of the database, building a database (e.g. when a plan is compiled) doesn't create the shared client"""
+        if self._client is None:
+            self._client = get_default_client()
+        return self._client
+
+    def set_parent_page(self, page_parent_id: str) -> None:
+        """Set the parent page of a database that is not saved yet.
+        :param page_parent_id: The id of the parent page."""
+
+        self.db_dict["parent"] = {
+            "type": "page_id",
+            "page_id": page_parent_id
+        }
+
     def add_columns_for_class(self, type_of_class: str) -> None:
         """Add columns to the database according to the class given.
         :param type_of_class: The type of class [1gy, 2gy, 1ecg, 2ecg, 2ec, 3c] to add columns to the database."""
@@ -70,116 +92,97 @@ class NotionDB:
         self.db_dict["title"][0]["text"][
             "content"] = f"{type_of_class.upper()} - Calendrier des cours {datetime.datetime.now().year}-{int(datetime.datetime.now().year)+1}"
 
-        # Choose the columns schema according to the class given
+        # Choose the options of the columns according to the class given
         match type_of_class:
             case "1gy":
-                columns = [
-                    ("title", "Nom"),
-                    ("select", "Classe", [{"name": "Vide", "color": "blue"}, {"name": "1GY1", "color": "yellow"}, {"name": "1GY2", "color": "default"}, {"name": "1GY3", "color": "green"}, {"name": "1GY4", "color": "gray"}, {"name": "1GY5", "color": "red"}, {
-                     "name": "1GY6", "color": "pink"}, {"name": "1GY7", "color": "brown"}, {"name": "1GY8", "color": "blue"}, {"name": "1GY9", "color": "orange"}, {"name": "1GY10", "color": "purple"}, {"name": "1GY11", "color": "orange"}, {"name": "1GY12", "color": "brown"}]),
-                    ("date", "Date du cours"),
-                    ("select", "Durée du cours", [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
-                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}]),
-                    ("multi_select", "Groupe", [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
-                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Modalité du cours", [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
-                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}]),
-                    ("multi_select", "Notion étudiée", [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "💻Programmation", "color": "orange"}, {"name": "🔐 Cybersécurité", "color": "default"}, {"name": "🧩Représentation de l'information", "color": "yellow"}, {
-                     "name": "ℹ Informatique et société", "color": "purple"}, {"name": "💪🏼 Concours Castor Informatique", "color": "brown"}, {"name": "🔥 Distribution hottes Mails", "color": "red"}, {"name": "🖥 Architecture des ordinateurs", "color": "red"}, {"name": "🎨Web", "color": "pink"}]),
-                    ("rich_text", "Remarque"),
-                    ("number", "Série de semaine", "number")
-                ]
+                options = {
+                    "Classe": [{"name": "Vide", "color": "blue"}, {"name": "1GY1", "color": "yellow"}, {"name": "1GY2", "color": "default"}, {"name": "1GY3", "color": "green"}, {"name": "1GY4", "color": "gray"}, {"name": "1GY5", "color": "red"}, {
+                     "name": "1GY6", "color": "pink"}, {"name": "1GY7", "color": "brown"}, {"name": "1GY8", "color": "blue"}, {"name": "1GY9", "color": "orange"}, {"name": "1GY10", "color": "purple"}, {"name": "1GY11", "color": "orange"}, {"name": "1GY12", "color": "brown"}],
+                    "Durée du cours": [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
+                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}],
+                    "Groupe": [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
+                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}],
+                    "Modalité du cours": [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
+                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}],
+                    "Notion étudiée": [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "💻Programmation", "color": "orange"}, {"name": "🔐 Cybersécurité", "color": "default"}, {"name": "🧩Représentation de l'information", "color": "yellow"}, {
+                     "name": "ℹ Informatique et société", "color": "purple"}, {"name": "💪🏼 Concours Castor Informatique", "color": "brown"}, {"name": "🔥 Distribution hottes Mails", "color": "red"}, {"name": "🖥 Architecture des ordinateurs", "color": "red"}, {"name": "🎨Web", "color": "pink"}]
+                }
             case "2gy":
-                columns = [
-                    ("title", "Nom"),
-                    ("select", "Classe", [{"name": "Vide", "color": "blue"}, {"name": "2GY1", "color": "yellow"}, {"name": "2GY2", "color": "default"}, {"name": "2GY3", "color": "green"}, {"name": "2GY4", "color": "gray"}, {"name": "2GY5", "color": "red"}, {
-                     "name": "2GY6", "color": "pink"}, {"name": "2GY7", "color": "brown"}, {"name": "2GY8", "color": "blue"}, {"name": "2GY9", "color": "orange"}, {"name": "2GY10", "color": "purple"}, {"name": "2GY11", "color": "orange"}, {"name": "2GY12", "color": "brown"}]),
-                    ("date", "Date du cours"),
-                    ("select", "Durée du cours", [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
-                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}]),
-                    ("multi_select", "Groupe", [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
-                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Modalité du cours", [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
-                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}]),
-                    ("multi_select", "Notion étudiée", [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "💻Programmation", "color": "orange"}, {"name": "🤖 Robotique", "color": "red"}, {"name": "💪🏼 Concours Castor Informatique", "color": "brown"}, {"name": "🧩Algorithmique", "color": "yellow"}, {"name": "ℹ Informatique et société", "color": "brown"}, {
-                     "name": "🔥 Distribution hottes Mails", "color": "red"}, {"name": "🎨 Web", "color": "pink"}, {"name": "🕵🏼‍♂️ Cryptographie", "color": "blue"}, {"name": "📁 Fichiers et formats de fichiers", "color": "brown"}, {"name": "📶 Applications web et réseaux", "color": "default"}, {"name": "📁 Bases de données", "color": "default"}, {"name": "💤 Conclusion du cours", "color": "green"}]),
-                    ("rich_text", "Remarque"),
-                    ("number", "Série de semaine", "number")
-                ]
+                options = {
+                    "Classe": [{"name": "Vide", "color": "blue"}, {"name": "2GY1", "color": "yellow"}, {"name": "2GY2", "color": "default"}, {"name": "2GY3", "color": "green"}, {"name": "2GY4", "color": "gray"}, {"name": "2GY5", "color": "red"}, {
+                     "name": "2GY6", "color": "pink"}, {"name": "2GY7", "color": "brown"}, {"name": "2GY8", "color": "blue"}, {"name": "2GY9", "color": "orange"}, {"name": "2GY10", "color": "purple"}, {"name": "2GY11", "color": "orange"}, {"name": "2GY12", "color": "brown"}],
+                    "Durée du cours": [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
+                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}],
+                    "Groupe": [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
+                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}],
+                    "Modalité du cours": [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
+                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}],
+                    "Notion étudiée": [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "💻Programmation", "color": "orange"}, {"name": "🤖 Robotique", "color": "red"}, {"name": "💪🏼 Concours Castor Informatique", "color": "brown"}, {"name": "🧩Algorithmique", "color": "yellow"}, {"name": "ℹ Informatique et société", "color": "brown"}, {
+                     "name": "🔥 Distribution hottes Mails", "color": "red"}, {"name": "🎨 Web", "color": "pink"}, {"name": "🕵🏼‍♂️ Cryptographie", "color": "blue"}, {"name": "📁 Fichiers et formats de fichiers", "color": "brown"}, {"name": "📶 Applications web et réseaux", "color": "default"}, {"name": "📁 Bases de données", "color": "default"}, {"name": "💤 Conclusion du cours", "color": "green"}]
+                }
             case "1ecg":
-                columns = [
-                    ("title", "Nom"),
-                    ("select", "Classe", [{"name": "Vide", "color": "blue"}, {"name": "1ECG1", "color": "yellow"}, {"name": "1ECG2", "color": "default"}, {"name": "1ECG3", "color": "green"}, {"name": "1ECG4", "color": "gray"}, {"name": "1ECG5", "color": "red"}, {
-                     "name": "1ECG6", "color": "pink"}, {"name": "1ECG7", "color": "brown"}, {"name": "1ECG8", "color": "blue"}, {"name": "1ECG9", "color": "orange"}, {"name": "1ECG10", "color": "purple"}, {"name": "1ECG11", "color": "orange"}, {"name": "1ECG12", "color": "brown"}]),
-                    ("date", "Date du cours"),
-                    ("select", "Durée du cours", [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
-                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}]),
-                    ("multi_select", "Groupe", [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
-                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Modalité du cours", [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
-                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}]),
-                    ("multi_select", "Notion étudiée", [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📧 Courriel", "color": "gray"}, {"name": "📁 Fichiers", "color": "brown"}, {"name": "📄 Word", "color": "blue"}, {"name": "🖼 Powerpoint", "color": "purple"}, {
-                     "name": "ℹ Informatique et société", "color": "red"}, {"name": "⌨ Matériel informatique", "color": "yellow"}, {"name": "⚫⚪ Représentation de l'information", "color": "default"}, {"name": "🎨 Multimédia", "color": "pink"}, {"name": "💻Programmation", "color": "orange"}]),
-                    ("rich_text", "Remarque"),
-                    ("number", "Série de semaine", "number")
-                ]
+                options = {
+                    "Classe": [{"name": "Vide", "color": "blue"}, {"name": "1ECG1", "color": "yellow"}, {"name": "1ECG2", "color": "default"}, {"name": "1ECG3", "color": "green"}, {"name": "1ECG4", "color": "gray"}, {"name": "1ECG5", "color": "red"}, {
+                     "name": "1ECG6", "color": "pink"}, {"name": "1ECG7", "color": "brown"}, {"name": "1ECG8", "color": "blue"}, {"name": "1ECG9", "color": "orange"}, {"name": "1ECG10", "color": "purple"}, {"name": "1ECG11", "color": "orange"}, {"name": "1ECG12", "color": "brown"}],
+                    "Durée du cours": [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
+                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}],
+                    "Groupe": [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
+                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}],
+                    "Modalité du cours": [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
+                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}],
+                    "Notion étudiée": [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📧 Courriel", "color": "gray"}, {"name": "📁 Fichiers", "color": "brown"}, {"name": "📄 Word", "color": "blue"}, {"name": "🖼 Powerpoint", "color": "purple"}, {
+                     "name": "ℹ Informatique et société", "color": "red"}, {"name": "⌨ Matériel informatique", "color": "yellow"}, {"name": "⚫⚪ Représentation de l'information", "color": "default"}, {"name": "🎨 Multimédia", "color": "pink"}, {"name": "💻Programmation", "color": "orange"}]
+                }
 
             case "2ecg":
-                columns = [
-                    ("title", "Nom"),
-                    ("select", "Classe", [{"name": "Vide", "color": "blue"}, {"name": "2ECG1", "color": "yellow"}, {"name": "2ECG2", "color": "default"}, {"name": "2ECG3", "color": "green"}, {"name": "2ECG4", "color": "gray"}, {"name": "2ECG5", "color": "red"}, {
-                     "name": "2ECG6", "color": "pink"}, {"name": "2ECG7", "color": "brown"}, {"name": "2ECG8", "color": "blue"}, {"name": "2ECG9", "color": "orange"}, {"name": "2ECG10", "color": "purple"}, {"name": "2ECG11", "color": "orange"}, {"name": "2ECG12", "color": "brown"}]),
-                    ("date", "Date du cours"),
-                    ("select", "Durée du cours", [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
-                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}]),
-                    ("multi_select", "Groupe", [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
-                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Modalité du cours", [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
-                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}]),
-                    ("multi_select", "Notion étudiée", [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📧 Révisions sur le courriel", "color": "gray"}, {"name": "📁 Révisions sur les fichiers", "color": "brown"}, {"name": "📄 Révisions Word", "color": "brown"}, {"name": "📄 Word", "color": "blue"}, {
-                     "name": "📈 Excel", "color": "pink"}, {"name": "ℹ Informatique et société", "color": "red"}, {"name": "⌨ ASSAP", "color": "yellow"}, {"name": "💻 Programmation", "color": "default"}, {"name": "💪🏼 Concours Castor Informatique", "color": "purple"}, {"name": "💻Programmation", "color": "orange"}]),
-                    ("rich_text", "Remarque"),
-                    ("number", "Série de semaine", "number")
-                ]
+                options = {
+                    "Classe": [{"name": "Vide", "color": "blue"}, {"name": "2ECG1", "color": "yellow"}, {"name": "2ECG2", "color": "default"}, {"name": "2ECG3", "color": "green"}, {"name": "2ECG4", "color": "gray"}, {"name": "2ECG5", "color": "red"}, {
+                     "name": "2ECG6", "color": "pink"}, {"name": "2ECG7", "color": "brown"}, {"name": "2ECG8", "color": "blue"}, {"name": "2ECG9", "color": "orange"}, {"name": "2ECG10", "color": "purple"}, {"name": "2ECG11", "color": "orange"}, {"name": "2ECG12", "color": "brown"}],
+                    "Durée du cours": [{"name": "1 période complète", "color": "purple"}, {"name": "2 périodes complètes", "color": "blue"}, {
+                     "name": "-", "color": "green"}, {"name": "1ère période uniquement", "color": "orange"}, {"name": "2ème période uniquement", "color": "orange"}],
+                    "Groupe": [{"name": "Groupe A+B", "color": "yellow"}, {"name": "Groupe A", "color": "brown"}, {"name": "Groupe B", "color": "orange"}, {"name": "1ère heure: A", "color": "pink"}, {
+                     "name": "1ère heure: B", "color": "pink"}, {"name": "2ème heure: A", "color": "pink"}, {"name": "2ème heure: B", "color": "pink"}, {"name": "-", "color": "green"}],
+                    "Modalité du cours": [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {"name": "⛱ Congé", "color": "green"}, {
+                     "name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}, {"name": "🔥 Examen en 1ère heure", "color": "red"}, {"name": "🔥🔥 Examen de synthèse", "color": "red"}],
+                    "Notion étudiée": [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📧 Révisions sur le courriel", "color": "gray"}, {"name": "📁 Révisions sur les fichiers", "color": "brown"}, {"name": "📄 Révisions Word", "color": "brown"}, {"name": "📄 Word", "color": "blue"}, {
+                     "name": "📈 Excel", "color": "pink"}, {"name": "ℹ Informatique et société", "color": "red"}, {"name": "⌨ ASSAP", "color": "yellow"}, {"name": "💻 Programmation", "color": "default"}, {"name": "💪🏼 Concours Castor Informatique", "color": "purple"}, {"name": "💻Programmation", "color": "orange"}]
+                }
 
             case "2ec":
-                columns = [
-                    ("title", "Nom"),
-                    ("select", "Classe", [{"name": "Vide", "color": "blue"}, {"name": "2EC1", "color": "yellow"}, {"name": "2EC2", "color": "default"}, {"name": "2EC3", "color": "green"}, {"name": "2EC4", "color": "gray"}, {"name": "2EC5", "color": "red"}, {
-                     "name": "2EC6", "color": "pink"}, {"name": "2EC7", "color": "brown"}, {"name": "2EC8", "color": "blue"}, {"name": "2EC9", "color": "orange"}, {"name": "2EC10", "color": "purple"}, {"name": "2EC11", "color": "orange"}, {"name": "2EC12", "color": "brown"}]),
-                    ("date", "Date du cours"),
-                    ("select", "Durée du cours", [
-                     {"name": "1 période complète", "color": "purple"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Groupe", [
-                     {"name": "Classe entière", "color": "orange"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Modalité du cours", [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {
-                     "name": "⛱ Congé", "color": "green"}, {"name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}]),
-                    ("multi_select", "Notion étudiée", [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📕 Révisions offre", "color": "red"}, {"name": "📗 Révisions commande", "color": "brown"}, {"name": "🧾 Révisions confirmation de commande", "color": "brown"}, {
-                     "name": "😤 Réclamation", "color": "orange"}, {"name": "❗ Rappel", "color": "pink"}, {"name": "🕜 Prorogation", "color": "yellow"}, {"name": "😊 Remerciements", "color": "red"}, {"name": "🔝 Offre publicitaire", "color": "blue"}, {"name": "🏤 Négociation", "color": "purple"}, {"name": "💁🏼‍♂️ Oral ou relance", "color": "orange"}]),
-                    ("rich_text", "Remarque"),
-                    ("number", "Série de semaine", "number")
-                ]
+                options = {
+                    "Classe": [{"name": "Vide", "color": "blue"}, {"name": "2EC1", "color": "yellow"}, {"name": "2EC2", "color": "default"}, {"name": "2EC3", "color": "green"}, {"name": "2EC4", "color": "gray"}, {"name": "2EC5", "color": "red"}, {
+                     "name": "2EC6", "color": "pink"}, {"name": "2EC7", "color": "brown"}, {"name": "2EC8", "color": "blue"}, {"name": "2EC9", "color": "orange"}, {"name": "2EC10", "color": "purple"}, {"name": "2EC11", "color": "orange"}, {"name": "2EC12", "color": "brown"}],
+                    "Durée du cours": [
+                     {"name": "1 période complète", "color": "purple"}, {"name": "-", "color": "green"}],
+                    "Groupe": [
+                     {"name": "Classe entière", "color": "orange"}, {"name": "-", "color": "green"}],
+                    "Modalité du cours": [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {
+                     "name": "⛱ Congé", "color": "green"}, {"name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}],
+                    "Notion étudiée": [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📕 Révisions offre", "color": "red"}, {"name": "📗 Révisions commande", "color": "brown"}, {"name": "🧾 Révisions confirmation de commande", "color": "brown"}, {
+                     "name": "😤 Réclamation", "color": "orange"}, {"name": "❗ Rappel", "color": "pink"}, {"name": "🕜 Prorogation", "color": "yellow"}, {"name": "😊 Remerciements", "color": "red"}, {"name": "🔝 Offre publicitaire", "color": "blue"}, {"name": "🏤 Négociation", "color": "purple"}, {"name": "💁🏼‍♂️ Oral ou relance", "color": "orange"}]
+                }
 
             case "3ec":
-                columns = [
-                    ("title", "Nom"),
-                    ("select", "Classe", [{"name": "Vide", "color": "blue"}, {"name": "3EC1", "color": "yellow"}, {"name": "3EC2", "color": "default"}, {"name": "3EC3", "color": "green"}, {"name": "3EC4", "color": "gray"}, {"name": "3EC5", "color": "red"}, {
-                     "name": "3EC6", "color": "pink"}, {"name": "3EC7", "color": "brown"}, {"name": "3EC8", "color": "blue"}, {"name": "3EC9", "color": "orange"}, {"name": "3EC10", "color": "purple"}, {"name": "3EC11", "color": "orange"}, {"name": "3EC12", "color": "brown"}]),
-                    ("date", "Date du cours"),
-                    ("select", "Durée du cours", [
-                     {"name": "1 période complète", "color": "purple"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Groupe", [
-                     {"name": "Classe entière", "color": "orange"}, {"name": "-", "color": "green"}]),
-                    ("multi_select", "Modalité du cours", [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {
-                     "name": "⛱ Congé", "color": "green"}, {"name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}]),
-                    ("multi_select", "Notion étudiée", [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📕 Révisions demande d'offre et offre", "color": "red"}, {"name": "📗 Révisions commande", "color": "brown"}, {"name": "💌 Invitation et convocation", "color": "brown"}, {
-                     "name": "📄 Documents internes", "color": "orange"}, {"name": "💲 Révision recouvrement de créances", "color": "pink"}, {"name": "💲 Assurances", "color": "yellow"}, {"name": "😠 Révisions réclamation", "color": "red"}, {"name": "🔄 Cas complet", "color": "blue"}]),
-                    ("rich_text", "Remarque", [{"name": "Remarque de test"}]),
-                    ("number", "Série de semaine", "number")
-                ]
+                options = {
+                    "Classe": [{"name": "Vide", "color": "blue"}, {"name": "3EC1", "color": "yellow"}, {"name": "3EC2", "color": "default"}, {"name": "3EC3", "color": "green"}, {"name": "3EC4", "color": "gray"}, {"name": "3EC5", "color": "red"}, {
+                     "name": "3EC6", "color": "pink"}, {"name": "3EC7", "color": "brown"}, {"name": "3EC8", "color": "blue"}, {"name": "3EC9", "color": "orange"}, {"name": "3EC10", "color": "purple"}, {"name": "3EC11", "color": "orange"}, {"name": "3EC12", "color": "brown"}],
+                    "Durée du cours": [
+                     {"name": "1 période complète", "color": "purple"}, {"name": "-", "color": "green"}],
+                    "Groupe": [
+                     {"name": "Classe entière", "color": "orange"}, {"name": "-", "color": "green"}],
+                    "Modalité du cours": [{"name": "📒 Leçon", "color": "yellow"}, {"name": "🔥 Examen", "color": "red"}, {"name": "⛱ Vacances", "color": "green"}, {
+                     "name": "⛱ Congé", "color": "green"}, {"name": "⛱ Congé épreuves en commun", "color": "green"}, {"name": "⛱ Jour férié", "color": "green"}],
+                    "Notion étudiée": [{"name": "⛱ - ", "color": "green"}, {"name": "🎒Introduction au cours", "color": "gray"}, {"name": "📕 Révisions demande d'offre et offre", "color": "red"}, {"name": "📗 Révisions commande", "color": "brown"}, {"name": "💌 Invitation et convocation", "color": "brown"}, {
+                     "name": "📄 Documents internes", "color": "orange"}, {"name": "💲 Révision recouvrement de créances", "color": "pink"}, {"name": "💲 Assurances", "color": "yellow"}, {"name": "😠 Révisions réclamation", "color": "red"}, {"name": "🔄 Cas complet", "color": "blue"}],
+                    "Remarque": [{"name": "Remarque de test"}]
+                }
             case _:
                 return None
 
+        # The columns are the same for every class (ROW_COLUMNS, also used to encode the rows), only their options differ
+        options["Série de semaine"] = "number"
+        columns = [(column_type, column_name, options[column_name]) if column_name in options else (column_type, column_name) for column_type, column_name in ROW_COLUMNS]
+
         # Add columns into the database
         self.add_columns_into_db(columns)
 
@@ -325,65 +328,50 @@ class NotionDB:
 
         self.db_dict['properties'][list(column_dict.keys())[0]] = column_dict[list(column_dict.keys())[0]]
 
-    def add_all_rows_for_a_class(self, year: str, class_name: str, config: Config) -> None:
+    def add_all_rows_for_a_class(self, year: str, class_name: str, config: Config) -> list[dict]:
         """Add all rows for a class according to the year and the class name.
+        The rows are inserted in parallel, the results are returned in the week order.
         :param year: The year of the class (1gy, 2gy, 1ecg, 2ecg, 2ec, 3ec).
         :param class_name: The name of the class.
         :param config: The configuration.
         """
 
-        # Global information
-        config_dict = config.config
-        monday_week_0 = config_dict["infos_generales"]["lundi_semaine_0"]
-        number_of_weeks_in_year = 45
-
-        # Add rows for each week            
-        counter_group_week = 0
-        for week_number in range(number_of_weeks_in_year):
-
-            # Get the day of the course
-            ecole = "gymnase" if "gy" in year else "ecg" if "ecg" in year else "ec"
-            day_course_1 = config_dict["niveaux"][ecole][year]["classes"][class_name]["cours_1"]["jour"]
-            day_course_2 = config_dict["niveaux"][ecole][year]["classes"][class_name]["cours_2"]["jour"]
-
-            # Compute the nth day during which the course will take place
-            nth_day_course_1 = day_to_value(day_course_1)
-            if day_course_2:
-                nth_day_course_2 = day_to_value(day_course_2)
-
-            # Compute the date of the course
-            date_course_1 = datetime.datetime.strftime(datetime.datetime.strptime(monday_week_0, "%Y-%m-%d") + datetime.timedelta(days=nth_day_course_1 + 7 * week_number), "%Y-%m-%d")
-            if day_course_2:
-                date_course_2 = datetime.datetime.strftime(datetime.datetime.strptime(monday_week_0, "%Y-%m-%d") + datetime.timedelta(days=nth_day_course_2 + 7 * week_number), "%Y-%m-%d")
-
-            # Compute the duration of the course
-            start_course_1 = config_dict["niveaux"][ecole][year]["classes"][class_name]["cours_1"]["heure_debut"]
-            end_course_1 = config_dict["niveaux"][ecole][year]["classes"][class_name]["cours_1"]["heure_fin"]
-            duration_course_1 = date_to_course_duration(config_dict["infos_generales"], date_course_1, start_course_1, end_course_1)
-
-            if day_course_2:
-                start_course_2 = config_dict["niveaux"][ecole][year]["classes"][class_name]["cours_2"]["heure_debut"]
-                end_course_2 = config_dict["niveaux"][ecole][year]["classes"][class_name]["cours_2"]["heure_fin"]
-                duration_course_2 = date_to_course_duration(config_dict["infos_generales"], date_course_2, start_course_2, end_course_2)
+        # Check if db is already saved
+        if not self.db_id:
+            print("Please, save db before adding rows")
+            return []
 
-            modality_course_1 = date_is_holiday(config_dict["infos_generales"], date_course_1)[1]
-            modality_course_2 = [""]
-            if day_course_2:
-                modality_course_2 = date_is_holiday(config_dict["infos_generales"], date_course_2)[1]
+        # Insert all rows in parallel
+        return self.save_rows_into_db(self.build_all_rows_for_a_class(year, class_name, config))
 
-            # Add a row for each course in the week
-            self.add_default_row_for_class(class_name.upper(), week_number, date_course_1 , duration_course_1, [], modality_course_1, [], math.ceil(counter_group_week / 4))
-            if day_course_2:
-                self.add_default_row_for_class(class_name.upper(), week_number, date_course_2 , duration_course_2, [], modality_course_2, [], math.ceil(counter_group_week / 4))
+    def build_all_rows_for_a_class(self, year: str, class_name: str, config: Config) -> list[RowRecord]:
+        """Build all rows for a class according to the year and the class name, in the week order, without saving them.
+        :param year: The year of the class (1gy, 2gy, 1ecg, 2ecg, 2ec, 3ec).
+        :param class_name: The name of the class.
+        :param config: The configuration.
+        """
+        return [row for _, row in self.build_keyed_rows_for_a_class(year, class_name, config)]
 
-            # Ignore the holidays week to create the group of 4 weeks
-            if  "⛱ Vacances" in modality_course_1 and "⛱ Vacances" in modality_course_2:
-                counter_group_week += 0
-            else:
-                counter_group_week += 1
+    def build_keyed_rows_for_a_class(self, year: str, class_name: str, config: Config) -> list[tuple[str, RowRecord]]:
+        """Build all rows for a class in the week order, each row with a key "{week_number}/{course_number}".
+        The key of a lesson doesn't change when another course of the class is added or removed.
+        :param year: The year of the class (1gy, 2gy, 1ecg, 2ecg, 2ec, 3ec).
+        :param class_name: The name of the class.
+        :param config: The configuration.
+        """
 
-        return None
+        # All lessons of the class, computed in one pass (dates, holidays, durations and week series)
+        return self.build_keyed_rows(class_name, LessonCalendar(config.config).lessons_for_a_class(year, class_name))
 
+    def build_keyed_rows(self, class_name: str, lessons: list[Lesson]) -> list[tuple[str, RowRecord]]:
+        """Build a row for each lesson of a class (in the order of the lessons), each row with a key "{week_number}/{course_number}".
+        :param class_name: The name of the class.
+        :param lessons: The lessons of the class, computed by a LessonCalendar.
+        """
+        return [
+            (f"{lesson.week_number}/{lesson.course_number}", RowRecord(class_name.upper(), lesson.week_number, lesson.date, lesson.duration, [], lesson.modality, [], lesson.group_week))
+            for lesson in lessons
+        ]
 
     def add_default_row_for_class(self, class_name: "str", nb_week: int, date_lesson: str,
     duration: str, group: list, modality: list, topics: list, group_week: int) -> None:
@@ -400,26 +388,7 @@ class NotionDB:
 
         # Check if db is already saved
         if self.db_id:
-            # Create a new page
-            page = notion_page.NotionPage(self.db_id, "database_id", emoji="📙")
-
-            # Add properties (=one row ) to the page
-            page.add_page_properties([
-                ("title", "Nom", f"Semaine {nb_week}"),
-                ("select", "Classe", class_name),
-                ("date", "Date du cours", (date_lesson, None, None)),
-                ("select", "Durée du cours", duration),
-                ("multi_select", "Groupe", group),
-                ("multi_select", "Modalité du cours", modality),
-                ("multi_select", "Notion étudiée", topics),
-                ("rich_text", "Remarque", []),
-                ("number", "Série de semaine", group_week)
-            ])
-            
-            # Add default heading to the page
-            page.add_heading(1, "Programme")
-
-            self.save_page_into_db(page)
+            self.save_rows_into_db([RowRecord(class_name, nb_week, date_lesson, duration, group, modality, topics, group_week)])
 
         else:
             print("Please, save db before adding rows")
@@ -434,21 +403,44 @@ class NotionDB:
 
     def add_row_into_db(self, row: list) -> None:
         """Add a row into the database.
-            :param row: A list of elements to add into the database.
+            :param row: A list of elements to add into the database, each element is a tuple (property_type, property_name, property_value).
         """
 
-        # Check that the column names of the given row matches the columns of the database and check that each column type is correct
-        if len([ element[1] for element in row if element[1] not in self.db_dict["properties"].keys()]) > 0:
-            print("The property name doesn't match the column name of the database: row not inserted into the database.")
+        try:
+            encoder = self.row_encoder([(element[0], element[1]) for element in row])
+        except ValueError as error:
+            print(f"{error}: row not inserted into the database.")
+            return None
+
+        page_dict = {
+            "parent": {
+                "type": "database_id",
+                "database_id": self.db_id
+            },
+            "properties": {
+                "title": [
+                    {
+                        "text": {
+                            "content": ""
+                        }
+                    }
+                ],
+                **encoder.encode([element[2] for element in row])
+            },
+            "children": []
+        }
+        self.client.create_page(page_dict)
+
+    def row_encoder(self, columns: list[tuple]) -> RowEncoder:
+        """Return the encoder of the rows having the given columns, compiled (and checked against the columns of the database) only the first time.
+            :param columns: The columns of the rows, each column is a tuple (column_type, column_name).
+        """
 
-        elif False in [True if element[0] == self.db_dict["properties"][element[1]]["type"] else False for element in row ]:
-            print("The property type doesn't match the column type of the database: row not inserted into the database.")
+        columns = tuple(columns)
+        if columns not in self.row_encoders:
+            self.row_encoders[columns] = RowEncoder.compile(self.db_dict["properties"], columns)
 
-        else:
-            page = notion_page.NotionPage(self.db_id, "database_id", emoji="")
-            for element in row:
-                page.add_page_property(element)
-            self.save_page_into_db(page)
+        return self.row_encoders[columns]
 
     def save_page_into_db(self, page: notion_page.NotionPage) -> None:
         """Save a page into the database.
@@ -457,9 +449,58 @@ class NotionDB:
 
         page.save_as_new_page()
 
+    def save_rows_into_db(self, rows: list[RowRecord]) -> list[dict]:
+        """Save many rows into the database in parallel (at most max_rows_in_flight at the same time).
+            :param rows: The rows to save into the database.
+            Return one result {"page_id", "url", "error"} per row, in the same order as the rows.
+        """
+
+        max_rows_in_flight = self.max_rows_in_flight if self.max_rows_in_flight is not None else self.client.pool_size
+        results = RowInserter(self.client, max_rows_in_flight).insert_rows([row.to_page_dict(self.db_id) for row in rows])
+
+        for result in results:
+            if result["error"] is not None:
+                print(f"Row not inserted into the database: {result['error']}")
+
+        return results
+
+    def query_all_rows(self, filter: dict = None) -> list[dict]:
+        """Get all rows (= pages) of the database from Notion, following the pagination.
+            :param filter: A Notion filter object to apply to the query (all rows if None).
+        """
+        return list(self.iter_rows(filter))
+
+    def iter_rows(self, filter: dict = None) -> Iterator[dict]:
+        """Yield the rows (= pages) of the database as each page of results arrives, the next page is fetched while the current one is processed.
+            :param filter: A Notion filter object to apply to the query (all rows if None).
+        """
+
+        body = {"page_size": 100}
+        if filter:
+            body["filter"] = filter
+
+        yield from iter_results(lambda start_cursor: self.query_page({**body, "start_cursor": start_cursor} if start_cursor else body))
+
+    def query_page(self, body: dict) -> dict:
+        """POST one query of the database and return the page of results.
+            :param body: The body of the query (page_size, filter, start_cursor).
+        """
+        return self.client.post(f"databases/{self.db_id}/query", json=body).json()
+
+    def load_row_table(self, filter: dict = None, indexed_columns: list = INDEXED_COLUMNS) -> RowTable:
+        """Read the rows of the database into a local table indexed by column, to answer lookups without any request.
+            :param filter: A Notion filter object to apply to the query (all rows if None).
+            :param indexed_columns: The columns having a secondary index.
+        """
+
+        table = RowTable(indexed_columns)
+        for page in self.iter_rows(filter):
+            table.add_page(page)
+
+        return table
+
     def save_as_a_new_db(self) -> None:
         """POST the new page and save the id into the db_id attribute"""
 
-        res = requests.post("https://api.notion.com/v1/databases",
-                            headers=self.headers, json=self.db_dict, timeout=10)   
+        res = self.client.post("databases", json=self.db_dict, timeout=10)
         self.db_id = res.json()['id']
@@ -1,35 +1,28 @@
 import copy
-import datetime
-import os
 import pprint
-from tkinter import messagebox
-from typing import List, Tuple
-from config.config import Config
 import requests
-from dotenv import load_dotenv
+from typing import Callable, Iterator, List, Tuple
+from config.config import Config
+from notion.block_reader import BlockReader
+from notion.notion_client import NotionAPIError, NotionClient, get_default_client
+from notion.row_encoder import PROPERTY_ENCODERS, READ_ONLY_PROPERTY_TYPES
+from utils.messages import logger, show_error, show_warning
 
 
 class NotionPage:
     """Class to create, edit and save a page to Notion"""
 
-    def __init__(self, parent_id: str = "", parent_type: str = "page_id", page_title: str = "", emoji: str = "", page_id=""):
+    def __init__(self, parent_id: str = "", parent_type: str = "page_id", page_title: str = "", emoji: str = "", page_id="", client: NotionClient = None):
         """Constructor of the NotionPage class
         :param parent_id: the id of the parent page
         :param parent_type: the type of the parent page (page_id, database_id)
         :param page_title: the title of the page
         :param emoji: the emoji of the page
         :param page_id: the id of the page to load from Notion
+        :param client: the Notion client used to send the requests (the shared client is used if None)
         """
-        # Load environment variables (Notion API Key)
-        load_dotenv()
-        self.NOTION_API_KEY = os.getenv("NOTION_API_KEY")
-
-        # Header of the HTTP request
-        self.headers = {
-            "Authorization": f"Bearer {self.NOTION_API_KEY}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-02-22"
-        }
+        # Client that sends the HTTP requests through a shared connection pool (the shared client is only created when a request is sent)
+        self._client = client
 
         # If we create the page locally
         if page_id == "":
@@ -69,32 +62,53 @@ class NotionPage:
             self.get_page_properties_from_notion(page_id)
             self.get_page_content_from_notion(page_id)
 
+    @property
+    def client(self) -> NotionClient:
+        """Return the client of the page, building a page (e.g. when a plan is compiled) doesn't create the shared client"""
+        if self._client is None:
+            self._client = get_default_client()
+        return self._client
+
     def get_page_properties_from_notion(self, page_id) -> None:
         """Get page properties from Notion
             :param page_id: the id of the page to get the properties from
         """
-        res = requests.get(
-            f"https://api.notion.com/v1/pages/{page_id}", headers=self.headers, timeout=20)
+        res = self.client.get(f"pages/{page_id}")
         self.page_id = res.json()["id"]
         self.page_dict = res.json()
 
     def get_page_content_from_notion(self, page_id) -> None:
-        """Get page content from Notion
+        """Get page content from Notion (all the blocks of the page, without their nested children)
             :param page_id: the id of the page to get the content from
         """
-        res = requests.get(
-            f"https://api.notion.com/v1/blocks/{page_id}/children", headers=self.headers, timeout=20)
-        self.page_dict["children"] = res.json()["results"]
+        self.page_dict["children"] = [block for _, block in BlockReader(self.client).iter_blocks(page_id)]
         self.nb_blocks_not_saved_since_last_save = 0
 
+    def iter_content_from_notion(self, recursive: bool = False) -> Iterator[tuple[int, dict]]:
+        """Stream the content of the saved page from Notion, without keeping it in memory
+            Yield (depth, block) for each block, the nested children of a block are yielded right after it if recursive is True.
+            :param recursive: if True, read the nested children of the blocks too
+        """
+        return BlockReader(self.client).iter_blocks(self.page_id, recursive)
+
+    def set_parent(self, parent_id: str, parent_type: str = "page_id") -> None:
+        """Set the parent of a page that is not saved yet
+            :param parent_id: the id of the parent page
+            :param parent_type: the type of the parent page (page_id, database_id)
+        """
+        self.page_dict["parent"] = {
+            "type": parent_type,
+            parent_type: parent_id
+        }
+
     def save_as_new_page(self) -> None:
-        """POST the new page and save the id into the page_id attribute"""
+        """POST the new page and save the id into the page_id attribute
+        The content is sent in the body of the POST (the blocks beyond the limit of Notion are appended afterwards).
+        """
 
-        res = requests.post("https://api.notion.com/v1/pages",
-                            headers=self.headers, json=self.page_dict, timeout=20)
-        print(res.json())
-        self.page_id = res.json()['id']
-        self.page_url = res.json()['url']
+        page = self.client.create_page(self.page_dict)
+        self.page_id = page['id']
+        self.page_url = page['url']
         self.nb_blocks_not_saved_since_last_save = 0
 
     def add_page_properties(self, properties: List[Tuple]) -> None:
@@ -128,102 +142,27 @@ class NotionPage:
         # Unpack the property tuple
         property_type, property_name, property_value = property
 
-        match property_type:
-            case "checkbox":
-                self.page_dict["properties"][property_name] = property_value
-
-            case "created_by":
-                print("Notion API doesn't allow to set the created_by property")
-                return None
-
-            case "created_time":
-                print("Notion API doesn't allow to set the created_time property")
-                return None
-
-            case "date":
-                self.page_dict["properties"][property_name] = {
-                    "start": property_value[0],
-                    "end": property_value[1],
-                    "time_zone": property_value[2]
-                }
-
-            case "email":
-                self.page_dict["properties"][property_name] = property_value
-
-            case "files":
-                self.page_dict["properties"][property_name] = []
-                for value in property_value:
-                    self.page_dict["properties"][property_name].append(
-                        {
-                            "name": value[0],
-                            "external": {
-                                "url": value[1]
-                            }
-                        }
-                    )
-
-            case "last_edited_time":
-                print("Notion API doesn't allow to set the last_edited_time property")
-                return None
-
-            case "multi_select":
-                self.page_dict["properties"][property_name] = []
-                for value in property_value:
-                    self.page_dict["properties"][property_name].append(
-                        {
-                            "name": value
-                        }
-                    )
-
-            case "number":
-                self.page_dict["properties"][property_name] = property_value
-
-            case "people":
-                self.page_dict["properties"][property_name] = []
-                for value in property_value:
-                    self.page_dict["properties"][property_name].append(
-                        {
-                            "id": value
-                        }
-                    )
-
-            case "phone_number":
-                self.page_dict["properties"][property_name] = property_value
-
-            case "rich_text":
-                self.page_dict["properties"][property_name] = []
-                for value in property_value:
-                    self.page_dict["properties"][property_name].append(
-                        {
-                            "text": {
-                                "content": value,
-                                "link": None
-                            }
-                        }
-                    )
-
-            case "select":
-                self.page_dict["properties"][property_name] = {
-                    "name": property_value,
-                }
-
-            case "title":
-                self.page_dict["properties"]["title"][0]["text"]["content"] = property_value
+        if property_type in READ_ONLY_PROPERTY_TYPES:
+            print(f"Notion API doesn't allow to set the {property_type} property")
+            return None
 
-            case "url":
-                self.page_dict["properties"][property_name] = property_value
+        # Unknown property type
+        if property_type not in PROPERTY_ENCODERS:
+            return None
 
-            case _:
-                return None
+        # The title is always stored with the "title" key
+        self.page_dict["properties"]["title" if property_type == "title" else property_name] = PROPERTY_ENCODERS[property_type](property_value)
 
     def append_unsaved_content_to_same_page(self) -> None:
-        """Append the unsaved content to the same page"""
+        """Append the unsaved content to the same page
+        The blocks added since the last save are buffered locally and sent together, in chunks of MAX_CHILDREN_PER_REQUEST blocks,
+        so it should be called once, after all the content has been added.
+        """
 
-        # If the page has already been saved, then append the unsaved content to the same page and save it again
-        if self.page_id:
-            res = requests.patch(f"https://api.notion.com/v1/blocks/{self.page_id}/children", headers=self.headers, json={
-                                 "children": self.page_dict["children"][self.nb_blocks_not_saved_since_last_save:]}, timeout=20)
-            self.page_dict["children"] = res.json()["results"]
+        # If the page has already been saved, then append the unsaved content (the last blocks added) to the same page
+        if self.page_id and self.nb_blocks_not_saved_since_last_save:
+            unsaved_blocks = self.page_dict["children"][-self.nb_blocks_not_saved_since_last_save:]
+            self.page_dict["children"][-self.nb_blocks_not_saved_since_last_save:] = self.client.append_block_children(self.page_id, unsaved_blocks)
             self.nb_blocks_not_saved_since_last_save = 0
 
     def add_heading(self, heading_level: int, text_content: str, text_color: str = "default") -> None:
@@ -382,7 +321,7 @@ class NotionPage:
         self.page_dict["children"].append(table_dict)
         self.nb_blocks_not_saved_since_last_save += 1
 
-    def create_page_for_a_class(self, class_info: dict, general_info: dict, notion_page_url_jupyterhub_users: str) -> None:
+    def create_page_for_a_class(self, class_info: dict, general_info: dict, notion_page_url_jupyterhub_users: str, admin_info: dict) -> None:
         """Create a page for a class
         :param general_info: a dict containing the general information. The format of the dict is the following:
         "infos_generales": {
@@ -406,15 +345,16 @@ class NotionPage:
             }
         },
         :param notion_page_id_jupyterhub_users: the id of the page containing the JupyterHub users
+        :param admin_info: a dict containing the teacher information ({"name", "surname", "email"}, see ClientConfig.admin_info)
         """
         # Divider
         self.add_divider()
 
         # About the teacher
         self.add_heading(2, "A propos de l'enseignant")
-        self.add_paragraph(f"👨🏼‍🏫 {os.getenv('ADMIN_SURNAME')} {os.getenv('ADMIN_NAME')}")
+        self.add_paragraph(f"👨🏼‍🏫 {admin_info['surname']} {admin_info['name']}")
         self.add_paragraph("📧")
-        self.add_paragraph(str(os.getenv('ADMIN_EMAIL')), url="mailto:adresse", new_paragraph=False)
+        self.add_paragraph(str(admin_info['email']), url="mailto:adresse", new_paragraph=False)
 
         # About the course
         self.add_heading(2, "A propos du cours")
@@ -433,110 +373,112 @@ class NotionPage:
         self.add_heading(2, "Groupes")
 
     @staticmethod
-    def check_if_root_page_is_valid(page_id: str) -> bool:
-        """Check if the Notion page root ID is valid
+    def check_root_page(page_id: str) -> str:
+        """Check the Notion page root ID and return the result (the cause of a failure is logged)
+        Can be one of the following: "valid", "invalid" (the page doesn't exist or isn't shared with the integration),
+        "unauthorized" (the API key is refused), "unreachable" (network error or unexpected answer of Notion)
         :param page_id: str: Notion page root ID
         """
 
-        is_valid = True
-
         # Check if the page ID is valid, i.e. 36 characters
         if len(page_id) != 36:
-            messagebox.showwarning("Attention", "La page Notion n'existe pas. Veuillez entrer un identifiant de page valide.")
-            return False
-        
-        # Try to get the page from the Notion API
-        res = requests.get(f"https://api.notion.com/v1/pages/{page_id}", headers=NotionPage().headers, timeout=10 )
-
-        # Check if the page exists
-        if res.status_code != 200:
-            return False
-    
-        if not is_valid:
-            # Display warning message
-            messagebox.showwarning("Attention", "La page Notion n'existe pas. Veuillez entrer un identifiant de page valide.")
-            return False
-        
-        return True
-        
+            logger.warning(f"{page_id} is not a Notion page id (36 characters expected)")
+            return "invalid"
+
+        # Try to get the page from the Notion API and check if the page exists
+        try:
+            get_default_client().get(f"pages/{page_id}", timeout=10)
+        except NotionAPIError as error:
+            logger.warning(f"The root page {page_id} can't be read: {error}")
+            if error.status == 401:
+                return "unauthorized"
+            if error.status in (400, 403, 404):
+                return "invalid"
+            return "unreachable"
+        except requests.RequestException as error:
+            logger.warning(f"Notion can't be reached: {error}")
+            return "unreachable"
+
+        return "valid"
 
     @staticmethod
-    def create_pages_from_config(config: Config, notion_root_page_id: str) -> None:
-        """Create pages from a configuration file
-        :param config: a dict containing the configuration
+    def check_if_root_page_is_valid(page_id: str) -> bool:
+        """Check if the Notion page root ID is valid, display the cause to the user if it isn't
+        :param page_id: str: Notion page root ID
         """
 
-        from notion.notion_db import NotionDB
+        match NotionPage.check_root_page(page_id):
+            case "valid":
+                return True
+            case "invalid":
+                show_warning("Attention", "La page Notion n'existe pas. Veuillez entrer un identifiant de page valide.")
+            case "unauthorized":
+                show_error("Erreur", "La clé de l'API Notion (NOTION_API_KEY) n'est pas valide.")
+            case _:
+                show_error("Erreur", "Impossible de contacter Notion. Veuillez vérifier la connexion internet et réessayer.")
+        return False
+
+    @staticmethod
+    def create_pages_from_config(config: Config, notion_root_page_id: str, client: NotionClient = None, journal_path: str = None, on_progress: Callable[[int, int], None] = None) -> list[str]:
+        """Create pages from a configuration file, return the messages of the pages to update by hand
+        The configuration is first compiled into a plan (without any network access), then the plan is executed:
+        each page, database and row is created as soon as its parent is created.
+        Each creation is recorded in a journal with the hash of its content, so running it again is idempotent:
+        what is already created is skipped (or updated if it changed) and a run that died halfway is resumed.
+        The content of a page already created is never replaced: when it changed, the page is reported to be updated by hand.
+        Delete the journal to generate a new calendar from scratch.
+        :param config: a dict containing the configuration
+        :param client: the Notion client shared by all pages and databases (the default client is used if None)
+        :param journal_path: the path of the journal (journal_<notion_root_page_id>.jsonl next to the configuration file if None)
+        :param on_progress: a function called with the number of nodes done and the total number of nodes each time a node is done
+        """
 
-        # Get the configuration dictionary
-        config_dict = config.config
+        from notion.generation_journal import GenerationJournal, default_journal_path
+        from notion.generation_plan import GenerationPlan
+        from notion.plan_executor import PlanExecutor
 
-        # Year interval: 2023-2024
-        # Short year interval: 23-24
-        current_year_interval = f"{datetime.datetime.now().year}-{int(datetime.datetime.now().year)+1}"
-        short_current_year_interval = f"{str(datetime.datetime.now().year)[2:]}-{str(int(datetime.datetime.now().year)+1)[2:]}"
+        # All pages and databases share the same connection pool
+        client = client if client is not None else get_default_client()
 
-        # Create page with general info
         print("Page id", notion_root_page_id)
-        page_general_info = NotionPage(parent_id=notion_root_page_id, parent_type="page_id", page_title=f"Année {current_year_interval}")
-        page_general_info.add_heading(2, "Informations générales")
-        page_general_info.save_as_new_page()
-
-        # Create page with all JupyterHub accounts
-        page_jupyterhub = NotionPage(parent_id=page_general_info.page_id, parent_type="page_id", page_title=f"Liste des comptes JupyterHub de tous les étudiants [{short_current_year_interval}]", emoji="🤓")
-        page_jupyterhub.add_paragraph("Vous trouverez ci-dessous votre nom d'utilisateur pour accéder à")
-        page_jupyterhub.add_paragraph("la plateforme JupyterHub", url="https://jupyterhub.informatique-csud.ch", new_paragraph=False)
-        page_jupyterhub.add_paragraph("qui sera utilisée toute l'année pour apprendre la programmation Python")
-        page_jupyterhub.save_as_new_page()
-
-        # Create page for exams retaking
-        page_exam_retaking = NotionPage(parent_id=page_general_info.page_id, parent_type="page_id", page_title=f"Rattrapages examens [{short_current_year_interval}]", emoji="📄")
-        page_exam_retaking.add_table([["Classe", "Elève", "Date rattrapage", "Etat"], [" ", " ", " ", " "], [" ", " ", " ", " "], [" ", " ", " ", " "]])
-        page_exam_retaking.save_as_new_page()
-
-        # Create page for the schedule
-        schedule_page = NotionPage(parent_id=page_general_info.page_id, parent_type="page_id", page_title=f"Horaires [{short_current_year_interval}]", emoji="📆")
-        schedule_page.save_as_new_page()
-
-        # Create page for the maturity work
-        tm_page = NotionPage(parent_id=page_general_info.page_id, page_title=f"Travaux de maturité [{short_current_year_interval}]", emoji="📄")
-        tm_page.add_heading(2, "Sujet")
-        tm_page.add_paragraph("Description du sujet à ajouter ici")
-        tm_page.add_heading(2, "Calendrier des séances/échéances")
-        tm_page.save_as_new_page()
-
-        # Go through the configuration file and create the pages/database for each program (1gy, 2gy, 1ecg, 2ecg, 1ec, 2ec)       
-        for niveau in config_dict['niveaux']:
-            
-            page_general_info.add_heading(2, f"{niveau.capitalize()}")
-            page_general_info.append_unsaved_content_to_same_page()
-
-          
-            for annee in config_dict['niveaux'][niveau]:
-
-                # Create a page for each year
-                page_year = NotionPage(parent_id=page_general_info.page_id, parent_type="page_id", page_title=f"{annee.upper()} [{short_current_year_interval}]")
-                page_year.save_as_new_page()
-
-                # Create a database for each year
-                # Check if database already exists
-                database_for_a_specic_year = NotionDB(page_parent_id=page_year.page_id, db_title=f"{annee.upper()} - Calendrier des cours [{short_current_year_interval}]", db_emoji="📆")
-                database_for_a_specic_year.add_columns_for_class(annee)
-                database_for_a_specic_year.save_as_a_new_db()
-          
-
-                # Create a page for each class in each year
-                for classe in config_dict['niveaux'][niveau][annee]["classes"]:
-                        
-                        # Check that the class is not empty
-                        if not config_dict['niveaux'][niveau][annee]["classes"][classe]["nb_eleves"] == 0:
-                            # Add all rows for a class into the database
-                            database_for_a_specic_year.add_all_rows_for_a_class(annee, classe, config)
-
-                            # Create page for a class
-                            title = "Cours d'informatique" if niveau in ["gymnase", "ecg"] else ""
-                            class_info = config_dict['niveaux'][niveau][annee]["classes"][classe]
-                            general_info = config_dict['niveaux'][niveau][annee]["infos_generales"]
-                            page = NotionPage(parent_id=page_year.page_id, parent_type="page_id", page_title=f"{classe.upper()} - {title} [{short_current_year_interval}]", emoji="💻")
-                            page.create_page_for_a_class(class_info, general_info, page_jupyterhub.page_url)
-                            page.save_as_new_page()
\ No newline at end of file
+        plan = GenerationPlan.compile(config, client.config.admin_info())
+
+        journal = GenerationJournal(journal_path if journal_path else default_journal_path(getattr(config, "config_file_path", ""), notion_root_page_id))
+        executor = PlanExecutor(client, journal, on_progress=on_progress)
+        try:
+            executor.execute(plan, notion_root_page_id)
+        finally:
+            journal.close()
+
+        return executor.manual_actions
+
+    @staticmethod
+    def sync_pages_from_config(config: Config, notion_root_page_id: str, client: NotionClient = None, journal_path: str = None) -> dict:
+        """Update the year databases already generated so that they match the configuration (e.g. after a holiday date changed)
+        Only the rows that changed are updated, the missing rows are created and the rows that don't exist anymore are archived.
+        Raise a RuntimeError if a database of the configuration has never been generated (the other databases are synchronised).
+        :param config: a dict containing the configuration
+        :param client: the Notion client used to send the requests (the default client is used if None)
+        :param journal_path: the path of the journal written by create_pages_from_config (journal_<notion_root_page_id>.jsonl next to the configuration file if None)
+        """
+
+        from notion.calendar_sync import CalendarSync
+        from notion.generation_journal import GenerationJournal, default_journal_path
+        from notion.generation_plan import GenerationPlan
+
+        client = client if client is not None else get_default_client()
+
+        plan = GenerationPlan.compile(config, client.config.admin_info())
+
+        journal = GenerationJournal(journal_path if journal_path else default_journal_path(getattr(config, "config_file_path", ""), notion_root_page_id))
+        try:
+            summary = CalendarSync(client, journal).sync(plan, notion_root_page_id)
+        finally:
+            journal.close()
+
+        logger.info(f"{summary['created']} rows created, {summary['updated']} rows updated, {summary['archived']} rows archived, {summary['unchanged']} rows unchanged")
+
+        # The databases never generated are not in the journal, nothing can be synchronised for them
+        if summary["not_generated"]:
+            raise RuntimeError(f"{len(summary['not_generated'])} databases have never been generated (generate them first): {', '.join(summary['not_generated'])}")
+        return summary
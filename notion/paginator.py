@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
+
+def iter_pages(executor: ThreadPoolExecutor, fetch_page: Callable[[str], dict]) -> Iterator[dict]:
+    """Yield each page of results of a paginated endpoint of the Notion API, the next page is fetched while the caller processes the current one
+    :param executor: the executor that fetches the pages of results (a single worker can be shared by nested paginations)
+    :param fetch_page: a function sending the request for a cursor (first page if None) and returning the page of results
+    """
+
+    next_page = executor.submit(fetch_page, None)
+    while next_page is not None:
+        page = next_page.result()
+
+        # Fetch the next page of results while the results of this one are processed
+        next_page = executor.submit(fetch_page, page["next_cursor"]) if page.get("has_more") else None
+
+        yield page
+
+
+def iter_results(fetch_page: Callable[[str], dict]) -> Iterator[dict]:
+    """Yield the results of a paginated endpoint of the Notion API as each page of results arrives, the next page being prefetched
+    :param fetch_page: a function sending the request for a cursor (first page if None) and returning the page of results
+    """
+
+    # A single worker prefetches the next page of results
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        for page in iter_pages(executor, fetch_page):
+            yield from page["results"]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
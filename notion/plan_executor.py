@@ -0,0 +1,245 @@
+import threading
+from functools import partial
+from typing import Callable
+from notion.calendar_sync import UPDATED_ROW_PROPERTIES
+from notion.generation_journal import ARCHIVED_HASH, GenerationJournal, payload_hash
+from notion.generation_plan import ROOT_KEY, GenerationPlan, PlanNode
+from notion.notion_client import NotionClient
+from notion.row_inserter import RowInserter
+from notion.task_graph import TaskGraph
+from utils.messages import logger
+
+
+class PlanExecutor:
+    """Class that creates in Notion all the nodes of a generation plan, each node as soon as the nodes it depends on are created
+    When a journal is given, the writes are idempotent: a node already created with the same payload hash is skipped,
+    and a node created with another payload hash is updated (PATCH) instead of being created again.
+    """
+
+    def __init__(self, client: NotionClient, journal: GenerationJournal = None, max_rows_in_flight: int = None, on_progress: Callable[[int, int], None] = None) -> None:
+        """Constructor of the PlanExecutor class
+        :param client: the Notion client used to send the requests
+        :param journal: the journal mapping each node to its Notion id and payload hash (every node is created if None)
+        :param max_rows_in_flight: the maximum number of rows of a database inserted at the same time (pool size of the client if None)
+        :param on_progress: a function called with the number of nodes done and the total number of nodes each time a node is done
+        """
+        self.client = client
+        self.journal = journal
+        self.max_rows_in_flight = max_rows_in_flight if max_rows_in_flight is not None else client.pool_size
+        self.on_progress = on_progress
+
+        # Number of nodes done (created, updated or unchanged) and total number of nodes of the plan being executed
+        self.nb_nodes_done = 0
+        self.nb_nodes = 0
+        self.progress_lock = threading.Lock()
+
+        # Notion id and url of each node created
+        self.ids = {}
+        self.urls = {}
+
+        # Prefix of the keys recorded in the journal (root page and school year of the plan being executed)
+        self.journal_prefix = ""
+
+        # Nodes whose content changed but can't be updated automatically, one message per node
+        # Their old hash is kept in the journal, so they are reported again until the content is updated by hand
+        self.manual_actions = []
+
+    def execute(self, plan: GenerationPlan, root_page_id: str) -> dict:
+        """Create (or update) all the nodes of the plan under the given root page and return the Notion id of each node key
+        :param plan: the plan to execute
+        :param root_page_id: the id of the Notion page under which everything is created
+        """
+
+        self.ids = {ROOT_KEY: root_page_id}
+        self.urls = {}
+        self.journal_prefix = f"{root_page_id}/{plan.school_year}/"
+        self.nb_nodes_done = 0
+        self.nb_nodes = len(plan)
+        self.manual_actions = []
+
+        graph = TaskGraph(max_workers=self.client.pool_size)
+
+        # The new rows of a database are inserted together by a RowInserter (in parallel, in the week order)
+        new_rows_by_database = {}
+        for node in plan.nodes:
+            state = self.state(node)
+
+            if state == "unchanged":
+                graph.add_task(node.key, partial(self.node_done, node), node.dependencies())
+            elif state == "changed":
+                graph.add_task(node.key, partial(self.update_node, node), node.dependencies())
+            elif node.kind == "row":
+                new_rows_by_database.setdefault(node.parent, []).append(node)
+            else:
+                graph.add_task(node.key, partial(self.create_node, node), node.dependencies())
+
+        for database_key, rows in new_rows_by_database.items():
+            dependencies = {dependency for row in rows for dependency in row.dependencies()}
+            graph.add_task(f"rows/{database_key}", partial(self.create_rows, rows), sorted(dependencies))
+
+        # The rows created before whose key is not in the plan anymore (e.g. a course removed) are archived
+        for key, entry in self.rows_to_archive(plan):
+            graph.add_task(f"archive/{key}", partial(self.archive_row, key, entry), [])
+
+        graph.run()
+
+        return self.ids
+
+    def journal_entry(self, node: PlanNode) -> dict:
+        """Return the journal entry of a node, None if it was never created
+        :param node: the node
+        """
+        if self.journal is None:
+            return None
+        return self.journal.get(self.journal_prefix + node.key)
+
+    def rows_to_archive(self, plan: GenerationPlan) -> list[tuple[str, dict]]:
+        """Return the rows recorded in the journal that are not in the plan anymore, for the classes of the plan
+        Must be called once the state of every node is known (the rows still used by the plan are not returned).
+        :param plan: the plan being executed
+        """
+        if self.journal is None:
+            return []
+
+        classes = {node.key.split("/")[1] for node in plan.nodes if node.kind == "row"}
+        used_ids = set(self.ids.values())
+
+        rows = []
+        for key, entry in list(self.journal.entries.items()):
+            if not key.startswith(self.journal_prefix + "row/"):
+                continue
+            key = key[len(self.journal_prefix):]
+            if key not in plan.nodes_by_key and key.split("/")[1] in classes and entry["hash"] != ARCHIVED_HASH and entry["id"] not in used_ids:
+                rows.append((key, entry))
+        return rows
+
+    def archive_row(self, key: str, entry: dict) -> None:
+        """Archive a row that is not in the plan anymore and record it in the journal (it is restored if its key comes back)
+        :param key: the key of the row
+        :param entry: the journal entry of the row
+        """
+        self.client.patch(f"pages/{entry['id']}", json={"archived": True})
+        self.journal.record(self.journal_prefix + key, entry["id"], entry["url"], ARCHIVED_HASH)
+
+    def state(self, node: PlanNode) -> str:
+        """Return "new" if the node was never created, "unchanged" if it was created with the same payload, "changed" otherwise
+        The id and url of a node already created are reused by its children.
+        :param node: the node to check
+        """
+
+        entry = self.journal_entry(node)
+        if entry is None:
+            return "new"
+
+        self.ids[node.key] = entry["id"]
+        self.urls[node.key] = entry["url"]
+
+        return "unchanged" if entry["hash"] == payload_hash(node.notion_payload()) else "changed"
+
+    def record(self, node: PlanNode) -> None:
+        """Record the creation (or update) of a node in the journal
+        :param node: the node created or updated
+        """
+        if self.journal is not None:
+            content_hash = payload_hash(node.payload["children"]) if node.kind == "page" else None
+            self.journal.record(self.journal_prefix + node.key, self.ids[node.key], self.urls[node.key], payload_hash(node.notion_payload()), content_hash)
+        self.node_done(node)
+
+    def report_manual_action(self, node: PlanNode, reason: str) -> None:
+        """Report a node that must be updated by hand, without recording it (it stays "changed" in the journal)
+        :param node: the node
+        :param reason: what must be updated
+        """
+        message = f"{node.key} ({self.urls.get(node.key) or self.ids[node.key]}): {reason}"
+        logger.warning(message)
+        with self.progress_lock:
+            self.manual_actions.append(message)
+        self.node_done(node)
+
+    def node_done(self, node: PlanNode) -> None:
+        """Count a node as done and report the progress
+        :param node: the node created, updated or unchanged
+        """
+        with self.progress_lock:
+            self.nb_nodes_done += 1
+            nb_nodes_done = self.nb_nodes_done
+
+        if self.on_progress is not None:
+            self.on_progress(nb_nodes_done, self.nb_nodes)
+
+    def create_node(self, node: PlanNode) -> None:
+        """Create a page, a database or append blocks according to the kind of the node
+        :param node: the node to create
+        """
+
+        payload = node.notion_payload(self.ids, self.urls)
+
+        match node.kind:
+            case "page" | "row":
+                body = self.client.create_page(payload)
+            case "database":
+                body = self.client.post("databases", json=payload).json()
+            case "blocks":
+                self.client.append_block_children(payload["block_id"], payload["children"])
+                body = {"id": payload["block_id"], "url": ""}
+            case _:
+                raise ValueError(f"Unknown kind of node: {node.kind}")
+
+        self.ids[node.key] = body["id"]
+        self.urls[node.key] = body.get("url", "")
+        self.record(node)
+
+    def update_node(self, node: PlanNode) -> None:
+        """Update a node already created whose payload changed
+        The content (children blocks) of a page is not updated, only its properties and icon: a page whose content changed
+        is reported in manual_actions instead of being recorded, as are blocks appended to a page.
+        :param node: the node to update
+        """
+
+        payload = node.notion_payload(self.ids, self.urls)
+        notion_id = self.ids[node.key]
+
+        match node.kind:
+            case "page":
+                self.client.patch(f"pages/{notion_id}", json={key: payload[key] for key in ("properties", "icon") if key in payload})
+
+                # The entries recorded before the content hash existed can't tell if the content changed
+                if self.journal_entry(node).get("content_hash") != payload_hash(node.payload["children"]):
+                    self.report_manual_action(node, "the content of the page changed in the configuration, it must be updated by hand in Notion")
+                    return
+            case "row":
+                # The columns edited by hand in Notion (groups, topics, remarks) are kept
+                properties = {name: value for name, value in payload["properties"].items() if name in UPDATED_ROW_PROPERTIES}
+                body = {"properties": properties}
+
+                # A row archived when its key disappeared from the plan is restored
+                if self.journal_entry(node)["hash"] == ARCHIVED_HASH:
+                    body["archived"] = False
+                self.client.patch(f"pages/{notion_id}", json=body)
+            case "database":
+                self.client.patch(f"databases/{notion_id}", json={key: payload[key] for key in ("title", "description", "properties", "icon") if key in payload})
+            case "blocks":
+                self.report_manual_action(node, "the blocks changed in the configuration since they were appended, they must be updated by hand in Notion")
+                return
+            case _:
+                raise ValueError(f"Unknown kind of node: {node.kind}")
+
+        self.record(node)
+
+    def create_rows(self, rows: list[PlanNode]) -> None:
+        """Insert rows of a database in parallel, each row is recorded in the journal as soon as it is inserted
+        :param rows: the row nodes to insert
+        """
+
+        def on_result(index: int, result: dict) -> None:
+            if result["error"] is None:
+                self.ids[rows[index].key] = result["page_id"]
+                self.urls[rows[index].key] = result["url"]
+                self.record(rows[index])
+
+        payloads = [row.notion_payload(self.ids, self.urls) for row in rows]
+        results = RowInserter(self.client, self.max_rows_in_flight).insert_rows(payloads, on_result)
+
+        errors = [f"{row.key}: {result['error']}" for row, result in zip(rows, results) if result["error"] is not None]
+        if errors:
+            raise RuntimeError(f"{len(errors)} rows not inserted into the database: {errors[0]}")
@@ -0,0 +1,172 @@
+import random
+import threading
+import time
+from typing import Callable
+import requests
+
+
+class RequestCancelled(Exception):
+    """Exception raised instead of sending a request once the run it belongs to has been cancelled"""
+
+
+def check_cancelled(cancel_event: threading.Event) -> None:
+    """Raise a RequestCancelled if the run has been cancelled
+    :param cancel_event: the event set to cancel the run (nothing is checked if None)
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise RequestCancelled("request not sent: the run has been cancelled")
+
+
+def wait(seconds: float, cancel_event: threading.Event) -> None:
+    """Wait during the given number of seconds, raise a RequestCancelled as soon as the run is cancelled
+    :param seconds: the duration of the wait
+    :param cancel_event: the event set to cancel the run (the wait can't be interrupted if None)
+    """
+    if cancel_event is None:
+        time.sleep(seconds)
+    elif cancel_event.wait(seconds):
+        raise RequestCancelled("request not sent: the run has been cancelled")
+
+
+class TokenBucket:
+    """Class that limits the number of requests per second (token bucket algorithm)"""
+
+    def __init__(self, rate: float = 3, capacity: float = 3) -> None:
+        """Constructor of the TokenBucket class
+        :param rate: the number of tokens added to the bucket per second
+        :param capacity: the maximum number of tokens in the bucket (= maximum burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+
+        # Time before which no token can be taken (set when Notion answers with Retry-After)
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, cancel_event: threading.Event = None) -> float:
+        """Take a token from the bucket, wait until one is available if necessary, and return the time waited
+        :param cancel_event: the event set to cancel the run, the wait stops with a RequestCancelled when it is set
+        """
+
+        start = time.monotonic()
+        while True:
+            check_cancelled(cancel_event)
+            with self.lock:
+                now = time.monotonic()
+
+                # Refill the bucket according to the time elapsed since the last refill
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - start
+
+                # Time to wait before the next token is available
+                wait_time = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+
+            wait(wait_time, cancel_event)
+
+    def pause(self, seconds: float) -> None:
+        """Prevent any token from being taken during the given number of seconds
+        :param seconds: the duration of the pause
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class RequestScheduler:
+    """Class that sends all requests at the rate allowed by Notion and retries the throttled or failed ones"""
+
+    def __init__(self, rate: float = 3, burst: float = 3, max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30) -> None:
+        """Constructor of the RequestScheduler class
+        :param rate: the number of requests per second allowed by Notion (about 3 per integration)
+        :param burst: the number of requests that can be sent at once
+        :param max_retries: the maximum number of retries of a request answered with 429 or 5xx
+        :param backoff_base: the first backoff delay (in seconds), doubled at each retry
+        :param backoff_max: the maximum backoff delay (in seconds)
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # Statistics
+        self.queue_depth = 0
+        self.total_wait_time = 0.0
+        self.nb_requests = 0
+        self.nb_retries = 0
+        self.nb_throttled = 0
+        self.lock = threading.Lock()
+
+    def send(self, send_request: Callable[[], requests.Response], cancel_event: threading.Event = None) -> requests.Response:
+        """Send a request when a token is available and retry it on 429 (after Retry-After) or 5xx (jittered exponential backoff)
+        :param send_request: a function sending the request and returning the response
+        :param cancel_event: the event set to cancel the run: the waits are interrupted and nothing is sent (or retried) once it is set
+        """
+
+        attempt = 0
+        while True:
+            # Wait for a token
+            with self.lock:
+                self.queue_depth += 1
+            try:
+                waited = self.bucket.acquire(cancel_event)
+            finally:
+                with self.lock:
+                    self.queue_depth -= 1
+            with self.lock:
+                self.total_wait_time += waited
+                self.nb_requests += 1
+
+            res = send_request()
+
+            # Success, client error or no retry left: the response is returned as is
+            if (res.status_code != 429 and res.status_code < 500) or attempt >= self.max_retries:
+                return res
+
+            delay = self.backoff_delay(attempt)
+            if res.status_code == 429:
+                # Notion tells how long to wait: no request is sent by anyone during that time
+                retry_after = self.retry_after(res)
+                self.bucket.pause(retry_after if retry_after is not None else delay)
+                with self.lock:
+                    self.nb_throttled += 1
+            else:
+                wait(delay, cancel_event)
+
+            with self.lock:
+                self.nb_retries += 1
+            attempt += 1
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Return the delay before the next retry (exponential backoff with full jitter)
+        :param attempt: the number of retries already done
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(res: requests.Response) -> float:
+        """Return the number of seconds given by the Retry-After header, None if there is none
+        :param res: the response of the Notion API
+        """
+        try:
+            return max(0.0, float(res.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            return None
+
+    def get_stats(self) -> dict:
+        """Return the queue depth, the time spent waiting for tokens and the retry counters of the scheduler"""
+
+        with self.lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "total_wait_time": self.total_wait_time,
+                "average_wait_time": self.total_wait_time / self.nb_requests if self.nb_requests else 0.0,
+                "nb_requests": self.nb_requests,
+                "nb_retries": self.nb_retries,
+                "nb_throttled": self.nb_throttled
+            }
@@ -0,0 +1,160 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Notion ids found in the urls (with or without dashes)
+NOTION_ID_PATTERN = re.compile(r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}")
+
+
+def normalize_id(notion_id: str) -> str:
+    """Return a Notion id without dashes and in lower case, so that both formats of an id match
+    :param notion_id: the id of a page, a database or a block
+    """
+    return notion_id.replace("-", "").lower()
+
+
+class ResponseCache:
+    """Class that keeps the answers of the GET requests to the Notion API on disk, keyed by url and API version
+    The entries expire after a time to live, the least recently used ones are evicted when the cache is full,
+    and every entry whose url contains an id is dropped when this id is written.
+    The entries are served from memory and written through to an SQLite file, so that they survive a restart of the app.
+    The file belongs to one integration: it is cleared when it is opened with another API key.
+    """
+
+    def __init__(self, path: str, ttl: float = 300, max_entries: int = 1000, api_key: str = "") -> None:
+        """Constructor of the ResponseCache class
+        :param path: the path of the SQLite file of the cache
+        :param ttl: the time to live (in seconds) of an entry
+        :param max_entries: the maximum number of entries kept in the cache
+        :param api_key: the key of the Notion integration the answers are fetched with (only its hash is stored)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.lock = threading.Lock()
+
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+        # (url, API version) -> (body, time of creation), from the least to the most recently used
+        self.entries = OrderedDict()
+
+        # Normalised Notion id -> keys of the entries whose url contains this id
+        self.keys_by_id = {}
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (url TEXT, notion_version TEXT, body BLOB, created REAL, last_used REAL, PRIMARY KEY (url, notion_version))")
+        self.connection.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+
+        # The answers fetched with another API key may show pages this key can't access
+        self.connection.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        api_key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        row = self.connection.execute("SELECT value FROM settings WHERE name = 'api_key_hash'").fetchone()
+        if row is None or row[0] != api_key_hash:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.execute("INSERT OR REPLACE INTO settings VALUES ('api_key_hash', ?)", (api_key_hash,))
+        self.connection.commit()
+
+        # Load the entries still valid, the least recently used first
+        for url, notion_version, body, created in self.connection.execute("SELECT url, notion_version, body, created FROM responses ORDER BY last_used"):
+            self.add_entry((url, notion_version), body, created)
+        self.evict()
+        self.connection.commit()
+
+    def get(self, url: str, notion_version: str) -> bytes | None:
+        """Return the body of the cached answer of a GET, or None if it isn't cached (or has expired)
+        :param url: the full url of the request
+        :param notion_version: the version of the Notion API used
+        """
+
+        key = (url, notion_version)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl:
+                if entry is not None:
+                    self.remove_entry(key)
+                    self.connection.commit()
+                self.nb_misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.nb_hits += 1
+            return entry[0]
+
+    def put(self, url: str, notion_version: str, body: bytes) -> None:
+        """Cache the body of the answer of a GET
+        :param url: the full url of the request
+        :param notion_version: the version of the Notion API used
+        :param body: the body of the answer
+        """
+
+        key = (url, notion_version)
+        created = time.time()
+        with self.lock:
+            if key in self.entries:
+                self.remove_entry(key)
+            self.add_entry(key, body, created)
+            self.connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (url, notion_version, body, created, created))
+            self.evict()
+            self.connection.commit()
+
+    def invalidate(self, notion_id: str) -> None:
+        """Drop every entry whose url contains the given id (to call when the page, database or block is written)
+        :param notion_id: the id of the page, the database or the block written
+        """
+
+        with self.lock:
+            keys = list(self.keys_by_id.get(normalize_id(notion_id), ()))
+            for key in keys:
+                self.remove_entry(key)
+            if keys:
+                self.connection.commit()
+
+    def clear(self) -> None:
+        """Drop all entries"""
+
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_id.clear()
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+
+    def close(self) -> None:
+        """Save the order of use of the entries and close the file of the cache"""
+
+        with self.lock:
+            now = time.time()
+            self.connection.executemany("UPDATE responses SET last_used = ? WHERE url = ? AND notion_version = ?",
+                                        [(now - len(self.entries) + position, *key) for position, key in enumerate(self.entries)])
+            self.connection.commit()
+            self.connection.close()
+
+    def get_stats(self) -> dict:
+        """Return the number of entries, hits and misses of the cache"""
+        return {"cache_entries": len(self.entries), "cache_hits": self.nb_hits, "cache_misses": self.nb_misses}
+
+    def add_entry(self, key: tuple, body: bytes, created: float) -> None:
+        """Add an entry in memory (the lock must be held)"""
+        self.entries[key] = (body, created)
+        for notion_id in NOTION_ID_PATTERN.findall(key[0]):
+            self.keys_by_id.setdefault(normalize_id(notion_id), set()).add(key)
+
+    def remove_entry(self, key: tuple) -> None:
+        """Remove an entry from memory and from the file (the lock must be held, the caller commits)"""
+        del self.entries[key]
+        for notion_id in NOTION_ID_PATTERN.findall(key[0]):
+            keys = self.keys_by_id.get(normalize_id(notion_id))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys_by_id[normalize_id(notion_id)]
+        self.connection.execute("DELETE FROM responses WHERE url = ? AND notion_version = ?", key)
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache isn't over its size (the lock must be held, the caller commits)"""
+        while len(self.entries) > self.max_entries:
+            self.remove_entry(next(iter(self.entries)))
@@ -0,0 +1,65 @@
+# Function turning a value into the JSON of a property, for each type of property that can be set through the Notion API
+PROPERTY_ENCODERS = {
+    "checkbox": lambda value: value,
+    "date": lambda value: {"start": value[0], "end": value[1], "time_zone": value[2]},
+    "email": lambda value: value,
+    "files": lambda value: [{"name": name, "external": {"url": url}} for name, url in value],
+    "multi_select": lambda value: [{"name": name} for name in value],
+    "number": lambda value: value,
+    "people": lambda value: [{"id": user_id} for user_id in value],
+    "phone_number": lambda value: value,
+    "rich_text": lambda value: [{"text": {"content": text, "link": None}} for text in value],
+    "select": lambda value: {"name": value},
+    "title": lambda value: [{"text": {"content": value}}],
+    "url": lambda value: value,
+}
+
+# Types of property computed by Notion, they can't be set through the API
+READ_ONLY_PROPERTY_TYPES = ["created_by", "created_time", "last_edited_time"]
+
+
+class RowEncoder:
+    """Class that turns the values of a row straight into the properties JSON of a Notion page
+    The encoder of each column is chosen once, when the encoder is compiled, so that encoding a row doesn't check anything.
+    """
+
+    def __init__(self, columns: list[tuple]) -> None:
+        """Constructor of the RowEncoder class
+        :param columns: the columns of the rows, each column is a tuple (column_type, column_name)
+            - column_type can be one of the following: "checkbox", "created_by", "created_time", "date", "email", "files", "last_edited_time", "multi_select", "number", "people", "phone_number", "rich_text", "select", "title", "url"
+            - column_name is the name of the column in the database
+        """
+
+        self.columns = tuple(columns)
+
+        # (index of the value in the row, key of the property, encoder) of each column that can be set
+        self.fields = []
+        for index, (column_type, column_name) in enumerate(self.columns):
+            if column_type in READ_ONLY_PROPERTY_TYPES:
+                print(f"Notion API doesn't allow to set the {column_type} property")
+            elif column_type in PROPERTY_ENCODERS:
+                # The title is always sent with the "title" key, whatever the name of the title column
+                self.fields.append((index, "title" if column_type == "title" else column_name, PROPERTY_ENCODERS[column_type]))
+        self.fields = tuple(self.fields)
+
+    @staticmethod
+    def compile(schema: dict, columns: list[tuple]) -> "RowEncoder":
+        """Compile an encoder for rows of a database, after checking that the columns match the schema of the database
+        Raise a ValueError if a column doesn't exist in the database or if its type is not the type of the column of the database.
+        :param schema: the properties of the database (db_dict["properties"])
+        :param columns: the columns of the rows, each column is a tuple (column_type, column_name)
+        """
+
+        if any(column_name not in schema for _, column_name in columns):
+            raise ValueError("The property name doesn't match the column name of the database")
+
+        if any(column_type != schema[column_name]["type"] for column_type, column_name in columns):
+            raise ValueError("The property type doesn't match the column type of the database")
+
+        return RowEncoder(columns)
+
+    def encode(self, values: tuple) -> dict:
+        """Return the properties JSON of a row
+        :param values: the values of the row, in the order of the columns (the format of each value is described in NotionPage.add_page_property)
+        """
+        return {key: encoder(values[index]) for index, key, encoder in self.fields}
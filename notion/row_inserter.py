@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from notion.notion_client import NotionClient
+
+
+class RowInserter:
+    """Class that inserts many rows (= pages) into a Notion database in parallel"""
+
+    def __init__(self, client: NotionClient, max_in_flight: int = 4) -> None:
+        """Constructor of the RowInserter class
+        :param client: the Notion client used to send the requests
+        :param max_in_flight: the maximum number of rows being inserted at the same time
+        """
+        self.client = client
+        self.max_in_flight = max(1, max_in_flight)
+
+    def insert_rows(self, payloads: list[dict], on_result: Callable[[int, dict], None] = None) -> list[dict]:
+        """Insert all the given rows and return one result per row, in the same order as the payloads
+        :param payloads: a list of page dicts (parent, properties, children) to POST into the database
+        :param on_result: a function called with the index of the row and its result as soon as each row is inserted (or failed)
+        Each result has the following format: {"page_id": str, "url": str, "error": str or None}
+        """
+
+        if not payloads:
+            return []
+
+        def insert_and_report(index: int) -> dict:
+            result = self.insert_row(payloads[index])
+            if on_result is not None:
+                on_result(index, result)
+            return result
+
+        # The executor keeps at most max_in_flight requests running, map() returns the results in the input order
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(payloads))) as executor:
+            return list(executor.map(insert_and_report, range(len(payloads))))
+
+    def insert_row(self, payload: dict) -> dict:
+        """Insert one row and return its result
+        :param payload: the page dict to POST into the database
+        """
+
+        try:
+            body = self.client.create_page(payload)
+        except Exception as error:
+            return {"page_id": "", "url": "", "error": f"{error}"}
+
+        return {"page_id": body["id"], "url": body["url"], "error": None}
@@ -0,0 +1,87 @@
+from notion.row_encoder import RowEncoder
+
+
+# Columns of the year databases (column_type, column_name), in the order of the values encoded for a row
+# The databases are created with these columns (see NotionDB.add_columns_for_class), only the options of the columns depend on the class
+ROW_COLUMNS = (
+    ("title", "Nom"),
+    ("select", "Classe"),
+    ("date", "Date du cours"),
+    ("select", "Durée du cours"),
+    ("multi_select", "Groupe"),
+    ("multi_select", "Modalité du cours"),
+    ("multi_select", "Notion étudiée"),
+    ("rich_text", "Remarque"),
+    ("number", "Série de semaine")
+)
+
+# Encoder of the rows of the year databases, compiled once for all rows
+ROW_ENCODER = RowEncoder(ROW_COLUMNS)
+
+
+class RowRecord:
+    """Class that stores only the values of a row of a year database, converted to the Notion JSON format when the row is sent"""
+
+    __slots__ = ("class_name", "week_number", "date", "duration", "group", "modality", "topics", "group_week")
+
+    def __init__(self, class_name: str, week_number: int, date: str, duration: str, group: list, modality: list, topics: list, group_week: int) -> None:
+        """Constructor of the RowRecord class
+        :param class_name: The name of the class (e.g. 1GY1).
+        :param week_number: The number of the week.
+        :param date: The date of the lesson.
+        :param duration: The duration of the lesson.
+        :param group: The group of the lesson.
+        :param modality: The modality of the lesson.
+        :param topics: The topics of the lesson.
+        :param group_week: The group of the week.
+        """
+        self.class_name = class_name
+        self.week_number = week_number
+        self.date = date
+        self.duration = duration
+        self.group = group
+        self.modality = modality
+        self.topics = topics
+        self.group_week = group_week
+
+    def to_list(self) -> list:
+        """Return the values of the row as a list (used to serialise the row)"""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @staticmethod
+    def from_list(values: list) -> "RowRecord":
+        """Create a row from the list returned by to_list
+        :param values: the values of the row
+        """
+        return RowRecord(*values)
+
+    def to_page_dict(self, database_id) -> dict:
+        """Return the page to POST into the database (same page as the one built by NotionPage for a row)
+        :param database_id: the id of the database
+        """
+        return {
+            "parent": {
+                "type": "database_id",
+                "database_id": database_id
+            },
+            "properties": ROW_ENCODER.encode((f"Semaine {self.week_number}", self.class_name, (self.date, None, None), self.duration, self.group, self.modality, self.topics, [], self.group_week)),
+            "children": [
+                {
+                    "object": "block",
+                    "heading_1": {
+                        "rich_text": [
+                            {
+                                "text": {
+                                    "content": "Programme"
+                                }
+                            }
+                        ],
+                        "color": "default"
+                    }
+                }
+            ],
+            "icon": {
+                "type": "emoji",
+                "emoji": "📙"
+            }
+        }
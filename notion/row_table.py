@@ -0,0 +1,108 @@
+# Columns of the year databases indexed by default
+INDEXED_COLUMNS = ["Classe", "Date du cours", "Modalité du cours", "Série de semaine"]
+
+
+def property_value(property_type: str, value):
+    """Return a simple comparable value of a property, given in the format sent to Notion or in the format returned by Notion
+    :param property_type: the type of the column (title, select, multi_select, date, number, rich_text, ...)
+    :param value: the value of the property
+    """
+
+    # Format returned by Notion: {"id": ..., "type": ..., type: value}
+    if isinstance(value, dict) and "type" in value and value["type"] in value:
+        value = value[value["type"]]
+
+    match property_type:
+        case "title" | "rich_text":
+            return "".join(text.get("plain_text", text.get("text", {}).get("content", "")) for text in value or [])
+        case "select":
+            return value["name"] if value else None
+        case "multi_select":
+            return tuple(option["name"] for option in value or [])
+        case "date":
+            return value["start"] if value else None
+        case _:
+            return value
+
+
+class RowTable:
+    """Class that holds the rows of a database read from Notion as compact tuples of simple values, with secondary indexes
+    Each index maps a value of a column to the positions of the rows having this value (each option for a multi_select column),
+    so that lookups like "all exam rows of 1GY3" are answered locally without any request.
+    """
+
+    def __init__(self, indexed_columns: list = INDEXED_COLUMNS) -> None:
+        """Constructor of the RowTable class
+        :param indexed_columns: the columns having a secondary index
+        """
+
+        # Names of the columns, set by the first row (the id and the url of the rows are stored before them)
+        self.columns = ()
+        self.column_positions = {}
+
+        # One tuple (id, url, value of each column) per row
+        self.rows = []
+
+        # Secondary indexes: column -> value -> positions of the rows
+        self.indexes = {column: {} for column in indexed_columns}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add_page(self, page: dict) -> None:
+        """Add a row returned by Notion (/databases/{id}/query) to the table
+        :param page: the page of the row
+        """
+
+        properties = page["properties"]
+        if not self.columns:
+            self.columns = tuple(sorted(properties))
+            self.column_positions = {column: 2 + index for index, column in enumerate(self.columns)}
+
+        row = (page["id"], page.get("url", ""), *(property_value(properties[column]["type"], properties[column]) if column in properties else None for column in self.columns))
+        position = len(self.rows)
+        self.rows.append(row)
+
+        for column, index in self.indexes.items():
+            if column not in self.column_positions:
+                continue
+
+            value = row[self.column_positions[column]]
+            for key in (value if isinstance(value, tuple) else (value,)):
+                index.setdefault(key, []).append(position)
+
+    def find(self, criteria: dict) -> list[dict]:
+        """Return the rows matching all criteria, using the secondary indexes (and a scan of the candidates for the other columns)
+        :param criteria: the value of each column to match, e.g. {"Classe": "1GY3", "Modalité du cours": "🔥 Examen"}
+            For a multi_select column, the rows having this option are matched.
+        """
+
+        indexed = [column for column in criteria if column in self.indexes]
+        if indexed:
+            # Start from the smallest index entry and keep the positions present in the other ones
+            entries = sorted((self.indexes[column].get(criteria[column], []) for column in indexed), key=len)
+            positions = set(entries[0]).intersection(*entries[1:]) if len(entries) > 1 else entries[0]
+            positions = sorted(positions)
+        else:
+            positions = range(len(self.rows))
+
+        others = [column for column in criteria if column not in self.indexes]
+        return [self.row_as_dict(position) for position in positions if all(self.matches(position, column, criteria[column]) for column in others)]
+
+    def matches(self, position: int, column: str, expected) -> bool:
+        """Return True if the value of a column of a row is (or contains, for a multi_select column) the expected value
+        :param position: the position of the row
+        :param column: the name of the column
+        :param expected: the expected value
+        """
+        if column not in self.column_positions:
+            return False
+        value = self.rows[position][self.column_positions[column]]
+        return expected in value if isinstance(value, tuple) else value == expected
+
+    def row_as_dict(self, position: int) -> dict:
+        """Return a row as a dict {"id", "url", column: value}
+        :param position: the position of the row
+        """
+        row = self.rows[position]
+        return {"id": row[0], "url": row[1], **{column: row[index] for column, index in self.column_positions.items()}}
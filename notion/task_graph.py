@@ -0,0 +1,73 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+
+class TaskGraph:
+    """Class that runs tasks concurrently as soon as all the tasks they depend on are done (directed acyclic graph)"""
+
+    def __init__(self, max_workers: int = 10) -> None:
+        """Constructor of the TaskGraph class
+        :param max_workers: the maximum number of tasks running at the same time
+        """
+        self.max_workers = max_workers
+
+        # Tasks and dependencies, stored by key in the order they were added
+        self.tasks = {}
+        self.dependencies = {}
+
+    def add_task(self, key: str, function: Callable[[], Any], dependencies: list = None) -> None:
+        """Add a task to the graph
+        :param key: the unique key of the task
+        :param function: the function to execute, its return value is stored as the result of the task
+        :param dependencies: the keys of the tasks that must be done before this one (they must already be in the graph)
+        """
+
+        if key in self.tasks:
+            raise ValueError(f"The task {key} is already in the graph")
+
+        dependencies = list(dependencies or [])
+        for dependency in dependencies:
+            if dependency not in self.tasks:
+                raise ValueError(f"The task {key} depends on the unknown task {dependency}")
+
+        self.tasks[key] = function
+        self.dependencies[key] = dependencies
+
+    def run(self) -> dict:
+        """Run all tasks and return their results by key
+        If a task fails, no new task is started and the first error is raised once the running tasks are done
+        """
+
+        # Number of unfinished dependencies of each task and tasks waiting for each task
+        nb_waiting_dependencies = {key: len(dependencies) for key, dependencies in self.dependencies.items()}
+        dependents = {key: [] for key in self.tasks}
+        for key, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                dependents[dependency].append(key)
+
+        results = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {executor.submit(self.tasks[key]): key for key, nb in nb_waiting_dependencies.items() if nb == 0}
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    key = running.pop(future)
+                    try:
+                        results[key] = future.result()
+                    except Exception as task_error:
+                        error = error or task_error
+                        continue
+
+                    # Start the tasks whose dependencies are now all done
+                    for dependent in dependents[key]:
+                        nb_waiting_dependencies[dependent] -= 1
+                        if nb_waiting_dependencies[dependent] == 0 and error is None:
+                            running[executor.submit(self.tasks[dependent])] = dependent
+
+        if error is not None:
+            raise error
+
+        return results
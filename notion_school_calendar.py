@@ -1,19 +1,10 @@
-import json
-import os
-import pprint
-from datetime import *
-from datetime import datetime, timezone
-import requests
-from dotenv import load_dotenv
-from config.config import Config
-from notion import notion_db, notion_page
 from ui.app import *
 
 
 def main():
     """Main function of the app"""
 
-    # Create app GUI
+    # Create app GUI (the settings of the Notion API are loaded on the first request, not before the first frame)
     app_gui = AppUI()
     
     NOTION_ROOT_PAGE_ID = "a026cb1f-35fd-4631-a3e9-887e103c5d9a"
@@ -0,0 +1,63 @@
+import copy
+import os
+import pytest
+from config.config import Config
+from notion.client_config import ClientConfig
+from notion.local_server import LocalNotionServer
+from notion.notion_client import NotionClient
+from notion.request_scheduler import RequestScheduler
+
+
+# Example configuration of the repository
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config_2023_11_18_0.json")
+
+
+@pytest.fixture
+def server():
+    """Local stand-in of the Notion API, with a root page to generate under"""
+    server = LocalNotionServer().start()
+    yield server
+    server.stop()
+
+
+def make_client(server: LocalNotionServer, **kwargs) -> NotionClient:
+    """Return a client of the local server that isn't slowed down by the rate limit of Notion
+    :param server: the local server
+    :param kwargs: the other arguments of the NotionClient (e.g. cache)
+    """
+    config = ClientConfig("secret", base_url=server.base_url, admin_name="Nom", admin_surname="Prénom", admin_email="admin@example.com", cache_path="")
+    return NotionClient(base_url=server.base_url, scheduler=RequestScheduler(rate=1000, burst=100), config=config, **kwargs)
+
+
+@pytest.fixture
+def client(server):
+    return make_client(server)
+
+
+def load_config(course_2_day: str = "vendredi", heure_fin: str = "08:55") -> Config:
+    """Return the example configuration with students in the class 1gy1 only (90 lessons)
+    :param course_2_day: the day of the second course of 1gy1 ("" to remove the course)
+    :param heure_fin: the end of the first course of 1gy1
+    """
+    config = Config()
+    assert config.load_config_if_valid(CONFIG_PATH)
+    config.config = copy.deepcopy(config.config)
+
+    for niveau in config.config["niveaux"].values():
+        for annee in niveau.values():
+            for classe, class_info in annee["classes"].items():
+                if classe != "1gy1":
+                    class_info["nb_eleves"] = 0
+
+    class_info = config.config["niveaux"]["gymnase"]["1gy"]["classes"]["1gy1"]
+    class_info["cours_1"]["heure_fin"] = heure_fin
+    class_info["cours_2"]["jour"] = course_2_day
+    return config
+
+
+def rows_of(server: LocalNotionServer, classe: str) -> dict:
+    """Return the rows of a class stored by the local server, by id
+    :param server: the local server
+    :param classe: the name of the class (e.g. "1GY1")
+    """
+    return {page["id"]: page for page in server.pages.values() if "database_id" in page["parent"] and page["properties"]["Classe"]["select"]["name"] == classe}
@@ -0,0 +1,47 @@
+import pytest
+from conftest import load_config, rows_of
+from notion.notion_page import NotionPage
+
+
+def test_sync_counts(server, client, tmp_path):
+    """A moved course is updated in place, a removed course is archived, and restored when it comes back"""
+    journal_path = str(tmp_path / "journal.jsonl")
+    NotionPage.create_pages_from_config(load_config(), server.root_page_id, client=client, journal_path=journal_path)
+    rows = set(rows_of(server, "1GY1"))
+
+    assert NotionPage.sync_pages_from_config(load_config(), server.root_page_id, client=client, journal_path=journal_path) == \
+        {"created": 0, "updated": 0, "archived": 0, "unchanged": 90, "not_generated": []}
+
+    # The lessons of the second course move from friday to thursday: same rows, new dates
+    summary = NotionPage.sync_pages_from_config(load_config(course_2_day="jeudi"), server.root_page_id, client=client, journal_path=journal_path)
+    assert summary["created"] == 0 and summary["archived"] == 0 and summary["updated"] > 0
+    assert set(rows_of(server, "1GY1")) == rows
+
+    summary = NotionPage.sync_pages_from_config(load_config(course_2_day=""), server.root_page_id, client=client, journal_path=journal_path)
+    archived = [page for page in rows_of(server, "1GY1").values() if page["archived"]]
+    assert summary["created"] == 0 and summary["archived"] == len(archived) > 0
+
+    summary = NotionPage.sync_pages_from_config(load_config(course_2_day="jeudi"), server.root_page_id, client=client, journal_path=journal_path)
+    assert summary["created"] == 0 and summary["archived"] == 0
+    assert set(rows_of(server, "1GY1")) == rows
+    assert not any(page["archived"] for page in rows_of(server, "1GY1").values())
+
+
+def test_sync_keeps_rows_added_by_hand(server, client, tmp_path):
+    """A row added by hand in Notion is never archived, even on the date of a generated row"""
+    journal_path = str(tmp_path / "journal.jsonl")
+    NotionPage.create_pages_from_config(load_config(), server.root_page_id, client=client, journal_path=journal_path)
+    row = next(iter(rows_of(server, "1GY1").values()))
+
+    page = client.create_page({"parent": row["parent"], "properties": {"title": [{"text": {"content": "Séance de rattrapage"}}], "Classe": {"name": "1GY1"},
+                                                                      "Date du cours": {"start": row["properties"]["Date du cours"]["date"]["start"]}}})
+
+    summary = NotionPage.sync_pages_from_config(load_config(course_2_day=""), server.root_page_id, client=client, journal_path=journal_path)
+    assert summary["archived"] > 0
+    assert not server.pages[page["id"]]["archived"]
+
+
+def test_sync_without_generation_fails(server, client, tmp_path):
+    """Nothing can be synchronised before the databases are generated"""
+    with pytest.raises(RuntimeError):
+        NotionPage.sync_pages_from_config(load_config(), server.root_page_id, client=client, journal_path=str(tmp_path / "journal.jsonl"))
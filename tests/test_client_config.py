@@ -0,0 +1,13 @@
+import logging
+import pytest
+from notion.client_config import DEFAULT_CACHE_TTL, ClientConfig
+
+
+@pytest.mark.parametrize("value, cache_ttl", [("60", 60), ("0", 0), ("", DEFAULT_CACHE_TTL), ("5 min", DEFAULT_CACHE_TTL), ("-1", DEFAULT_CACHE_TTL), ("nan", DEFAULT_CACHE_TTL)])
+def test_cache_ttl_from_env(monkeypatch, caplog, value, cache_ttl):
+    """A malformed NOTION_CACHE_TTL falls back to the default with a warning instead of stopping the app"""
+    monkeypatch.setenv("NOTION_CACHE_TTL", value)
+
+    with caplog.at_level(logging.WARNING, logger="notion_school_calendar"):
+        assert ClientConfig.from_env().cache_ttl == cache_ttl
+    assert bool(caplog.records) == (value not in ("60", "0", ""))
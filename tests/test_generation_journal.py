@@ -0,0 +1,33 @@
+from notion.generation_journal import GenerationJournal, default_journal_path
+
+
+def test_record_after_torn_last_line(tmp_path):
+    """An entry recorded after a torn last line (program killed while writing) must be readable on the next load"""
+    path = tmp_path / "journal.jsonl"
+
+    journal = GenerationJournal(str(path))
+    journal.record("a", "id-a", "url-a", "hash-a")
+    journal.close()
+
+    # The program died while writing the entry of "b"
+    with open(path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"key": "b", "id')
+
+    journal = GenerationJournal(str(path))
+    assert sorted(journal.entries) == ["a"]
+    journal.record("c", "id-c", "url-c", "hash-c")
+    journal.close()
+
+    journal = GenerationJournal(str(path))
+    assert sorted(journal.entries) == ["a", "c"]
+    assert journal.get("c") == {"key": "c", "id": "id-c", "url": "url-c", "hash": "hash-c"}
+    journal.close()
+
+
+def test_default_journal_path_is_next_to_the_config(tmp_path, monkeypatch):
+    """The default journal doesn't depend on the directory the app is run from"""
+    config_path = tmp_path / "configs" / "config.json"
+    monkeypatch.chdir(tmp_path)
+
+    assert default_journal_path("configs/config.json", "root") == str(config_path.with_name("journal_root.jsonl"))
+    assert default_journal_path("", "root") == str(tmp_path / "journal_root.jsonl")
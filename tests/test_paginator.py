@@ -0,0 +1,47 @@
+from notion.block_reader import BlockReader
+from notion.notion_db import NotionDB
+from notion.paginator import iter_results
+
+
+def paragraph(text: str, children: list = None) -> dict:
+    """Return a paragraph block, with nested children if given"""
+    content = {"rich_text": [{"type": "text", "text": {"content": text}}]}
+    if children:
+        content["children"] = children
+    return {"object": "block", "type": "paragraph", "paragraph": content}
+
+
+def test_iter_results_follows_the_cursors():
+    """Every page of results is fetched once, with the cursor of the previous page"""
+    pages = {None: {"results": [1, 2], "has_more": True, "next_cursor": "a"},
+             "a": {"results": [3], "has_more": True, "next_cursor": "b"},
+             "b": {"results": [4, 5], "has_more": False, "next_cursor": None}}
+    cursors = []
+
+    def fetch_page(start_cursor):
+        cursors.append(start_cursor)
+        return pages[start_cursor]
+
+    assert list(iter_results(fetch_page)) == [1, 2, 3, 4, 5]
+    assert cursors == [None, "a", "b"]
+
+
+def test_block_reader_reads_nested_children_in_order(server, client):
+    """The children of a block come right after it, across several pages of results at each level"""
+    nested = [paragraph(f"1.{index}") for index in range(5)]
+    client.append_block_children(server.root_page_id, [paragraph("0"), paragraph("1", nested)] + [paragraph(f"{index}") for index in range(2, 7)])
+
+    blocks = [(depth, block["paragraph"]["rich_text"][0]["text"]["content"]) for depth, block in BlockReader(client, page_size=2).iter_blocks(server.root_page_id, recursive=True)]
+    assert blocks == [(0, "0"), (0, "1")] + [(1, f"1.{index}") for index in range(5)] + [(0, f"{index}") for index in range(2, 7)]
+
+
+def test_iter_rows_reads_every_page_of_results(server, client):
+    """All rows of a database are read, in the order of creation"""
+    database = NotionDB(page_parent_id=server.root_page_id, db_title="Calendrier", client=client)
+    database.add_columns_for_class("1gy")
+    database.save_as_a_new_db()
+    for index in range(120):
+        client.create_page({"parent": {"database_id": database.db_id}, "properties": {"title": [{"text": {"content": f"Semaine {index}"}}], "Classe": {"name": "1GY1"}}})
+
+    titles = [page["properties"]["Nom"]["title"][0]["plain_text"] for page in database.iter_rows()]
+    assert titles == [f"Semaine {index}" for index in range(120)]
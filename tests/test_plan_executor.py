@@ -0,0 +1,64 @@
+from conftest import load_config, rows_of
+from notion.generation_journal import ARCHIVED_HASH, GenerationJournal
+from notion.notion_page import NotionPage
+from notion.row_table import property_value
+
+
+def generate(server, client, config, journal_path) -> dict:
+    """Run the generation and return the number of requests received by the server, by method"""
+    before = dict(server.stats)
+    NotionPage.create_pages_from_config(config, server.root_page_id, client=client, journal_path=journal_path)
+    return {method: server.stats[method] - before[method] for method in ("GET", "POST", "PATCH")}
+
+
+def durations_of(server) -> dict:
+    """Return the duration of each row of the class 1gy1, by id"""
+    return {page_id: property_value(page["properties"]["Durée du cours"]["type"], page["properties"]["Durée du cours"]) for page_id, page in rows_of(server, "1GY1").items()}
+
+
+def test_rerun_sends_no_writes(server, client, tmp_path):
+    """Everything is recorded in the journal by the first run, so the second run has nothing to send"""
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    requests = generate(server, client, load_config(), journal_path)
+    assert requests["POST"] > 0
+    assert len(rows_of(server, "1GY1")) == 90
+
+    assert generate(server, client, load_config(), journal_path) == {"GET": 0, "POST": 0, "PATCH": 0}
+
+
+def test_changed_row_is_patched(server, client, tmp_path):
+    """A row whose columns changed in the configuration is updated in place, not created again"""
+    journal_path = str(tmp_path / "journal.jsonl")
+    generate(server, client, load_config(), journal_path)
+    durations = durations_of(server)
+
+    requests = generate(server, client, load_config(heure_fin="09:45"), journal_path)
+    assert requests["POST"] == 0
+    assert requests["PATCH"] > 0
+
+    # Same rows, only the lessons of the first course last longer
+    new_durations = durations_of(server)
+    assert new_durations.keys() == durations.keys()
+    assert 0 < sum(new_durations[page_id] != duration for page_id, duration in durations.items()) < len(durations)
+
+
+def test_removed_course_is_archived_then_restored(server, client, tmp_path):
+    """The rows of a removed course are archived and recorded as such, they are restored (same pages) when the course comes back"""
+    journal_path = str(tmp_path / "journal.jsonl")
+    generate(server, client, load_config(), journal_path)
+    rows = set(rows_of(server, "1GY1"))
+
+    requests = generate(server, client, load_config(course_2_day=""), journal_path)
+    assert requests["POST"] == 0
+    archived = {page_id for page_id, page in rows_of(server, "1GY1").items() if page["archived"]}
+    assert 0 < len(archived) < len(rows)
+
+    journal = GenerationJournal(journal_path)
+    assert {entry["id"] for entry in journal.entries.values() if entry["hash"] == ARCHIVED_HASH} == archived
+    journal.close()
+
+    requests = generate(server, client, load_config(), journal_path)
+    assert requests["POST"] == 0
+    assert set(rows_of(server, "1GY1")) == rows
+    assert not any(page["archived"] for page in rows_of(server, "1GY1").values())
@@ -0,0 +1,24 @@
+import time
+from conftest import make_client
+from notion.local_server import LocalNotionServer
+
+
+def test_rate_limited_requests_are_retried_after_retry_after():
+    """The requests answered with 429 are sent again once the Retry-After has elapsed, the caller only sees the final answer"""
+    server = LocalNotionServer(rate_limited_ratio=0.5, retry_after=0.2, seed=1).start()
+    try:
+        client = make_client(server)
+        start = time.monotonic()
+        for _ in range(10):
+            assert client.get(f"pages/{server.root_page_id}").json()["id"] == server.root_page_id
+        elapsed = time.monotonic() - start
+    finally:
+        server.stop()
+
+    stats = client.scheduler.get_stats()
+    assert server.stats["rate_limited"] > 0
+    assert stats["nb_throttled"] == stats["nb_retries"] == server.stats["rate_limited"]
+    assert stats["nb_requests"] == server.stats["GET"] == 10 + server.stats["rate_limited"]
+
+    # No request is sent before the Retry-After of the previous 429 has elapsed
+    assert elapsed >= server.stats["rate_limited"] * 0.2
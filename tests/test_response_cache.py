@@ -0,0 +1,40 @@
+from conftest import make_client
+from notion.response_cache import ResponseCache
+
+
+def test_write_invalidates_cached_answer(server, tmp_path):
+    """A GET is served from the cache until the page is written, then it is sent again and returns the new content"""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    client = make_client(server, cache=cache)
+    path = f"pages/{server.root_page_id}"
+
+    client.get(path)
+    client.get(path)
+    assert server.stats["GET"] == 1
+
+    client.patch(path, json={"properties": {"title": [{"text": {"content": "Nouveau titre"}}]}})
+    title = client.get(path).json()["properties"]["title"]["title"][0]["plain_text"]
+    assert server.stats["GET"] == 2
+    assert title == "Nouveau titre"
+
+    # The new answer is cached again
+    client.get(path)
+    assert server.stats["GET"] == 2
+    cache.close()
+
+
+def test_cache_is_cleared_when_the_api_key_changes(tmp_path):
+    """The answers fetched with another integration are not served"""
+    path = str(tmp_path / "cache.sqlite3")
+
+    cache = ResponseCache(path, api_key="key-1")
+    cache.put("https://api.notion.com/v1/pages/1", "2022-02-22", b"{}")
+    cache.close()
+
+    cache = ResponseCache(path, api_key="key-1")
+    assert cache.get("https://api.notion.com/v1/pages/1", "2022-02-22") == b"{}"
+    cache.close()
+
+    cache = ResponseCache(path, api_key="key-2")
+    assert cache.get("https://api.notion.com/v1/pages/1", "2022-02-22") is None
+    cache.close()
@@ -0,0 +1,13 @@
+import pytest
+from notion.notion_db import NotionDB
+from notion.row_encoder import RowEncoder
+from notion.row_record import ROW_COLUMNS
+
+
+@pytest.mark.parametrize("type_of_class", ["1gy", "2gy", "1ecg", "2ecg", "2ec", "3ec"])
+def test_row_columns_match_the_year_databases(type_of_class):
+    """The rows are encoded with the columns the year databases are created with"""
+    database = NotionDB(db_title="Calendrier")
+    database.add_columns_for_class(type_of_class)
+    RowEncoder.compile(database.db_dict["properties"], ROW_COLUMNS)
+    assert list(database.db_dict["properties"]) == [column_name for _, column_name in ROW_COLUMNS]
@@ -1,18 +1,20 @@
 import os
 import tkinter as tk
 from tkinter import *
+from tkinter import messagebox, ttk
 from typing import Callable
 from config.config import *
-from notion.notion_page import NotionPage
 from jsoneditor.editor import JsonEditor
 from ui.menu import MenuApp
-import requests
-from dotenv import load_dotenv
+from utils.messages import set_message_handlers
 
 class AppUI():
     """Class that creates the main window of the app"""
 
     def __init__(self) -> None:
+        # Errors and warnings are displayed in message boxes
+        set_message_handlers(messagebox.showerror, messagebox.showwarning)
+
         # Create root window
         self.root = Tk()
         self.root.title(
@@ -63,6 +65,10 @@ class AppUI():
         # Save notion root page ID
         self.notion_root_page_id = None
 
+        # Background worker of the generation and interval (in ms) at which its progress is polled
+        self.worker = None
+        self.poll_interval = 100
+
         self.root.mainloop()
 
     def change_title(self, title: str) -> None:
@@ -89,6 +95,76 @@ class AppUI():
             if function(args[1]):
                 self.display_content(args[0])       
 
+    def check_if_root_page_is_valid(self, page_id: str) -> bool:
+        """Check if the Notion page root ID is valid (the Notion modules are imported on first use)
+        :param page_id: str: Notion page root ID
+        """
+        from notion.notion_page import NotionPage
+
+        return NotionPage.check_if_root_page_is_valid(page_id)
+
+    def start_generation(self, mode: str) -> None:
+        """Start the generation (or the synchronisation) of the calendar in a background worker and follow its progress
+        :param mode: str: "generate" or "sync"
+        """
+        # The Notion modules (and requests) are only imported once the user generates a calendar
+        from ui.generation_worker import GenerationWorker
+
+        self.worker = GenerationWorker(self.config, self.notion_root_page_id, mode)
+        self.worker.start()
+
+        self.set_generation_running(True)
+        self.progress_bar.config(mode="determinate" if mode == "generate" else "indeterminate", value=0)
+        if mode == "sync":
+            self.progress_bar.start()
+        self.progress_label.config(text="Génération en cours..." if mode == "generate" else "Synchronisation en cours...")
+
+        self.root.after(self.poll_interval, self.poll_generation)
+
+    def set_generation_running(self, running: bool) -> None:
+        """Enable the cancel button while a generation is running and the other buttons otherwise
+        :param running: bool: True if a generation is running
+        """
+        for button in self.generation_buttons:
+            button.config(state=DISABLED if running else NORMAL)
+        self.cancel_button.config(state=NORMAL if running else DISABLED)
+
+    def cancel_generation(self) -> None:
+        """Cancel the generation running: it stops before the next request"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.config(state=DISABLED)
+            self.progress_label.config(text="Annulation en cours...")
+
+    def poll_generation(self) -> None:
+        """Display the events sent by the worker and poll again until the worker is finished
+        The errors and warnings are displayed even if another page was displayed in the meantime (the progress widgets are destroyed).
+        """
+
+        # The widgets of the progress are destroyed if another page was displayed in the meantime
+        widgets_exist = self.progress_bar.winfo_exists()
+
+        for event in self.worker.get_events():
+            match event["type"]:
+                case "progress":
+                    if widgets_exist:
+                        eta = f"{int(event['eta'] // 60)} min {int(event['eta'] % 60)} s" if event["eta"] is not None else "-"
+                        self.progress_bar.config(maximum=event["total"], value=event["done"])
+                        self.progress_label.config(text=f"{event['done']}/{event['total']} éléments - {event['requests_per_second']:.1f} requêtes/s - temps restant : {eta}")
+                case "error":
+                    messagebox.showerror("Erreur", f"La génération a échoué : {event['message']}")
+                case "warning":
+                    messagebox.showwarning("Attention", "Le contenu de ces pages a changé et doit être mis à jour à la main dans Notion :\n" + "\n".join(event["messages"]))
+                case "finished":
+                    self.worker = None
+                    if widgets_exist:
+                        self.progress_bar.stop()
+                        self.progress_label.config(text={"done": "Terminé", "cancelled": "Annulé (relancer la génération reprend là où elle s'est arrêtée)", "failed": "Echec"}[event["status"]])
+                        self.set_generation_running(False)
+                    return
+
+        self.root.after(self.poll_interval, self.poll_generation)
+
     def display_content(self, page: str) -> None:
         """Display the content of the frame
         :param page: str: page to display
@@ -165,13 +241,13 @@ class AppUI():
                 entry.config(width=50)
 
                 # If user presses enter, execute the function
-                entry.bind("<Return>", lambda event: self.execute_and_redirect(NotionPage.check_if_root_page_is_valid, "generate_calendar", entry.get()))
+                entry.bind("<Return>", lambda event: self.execute_and_redirect(self.check_if_root_page_is_valid, "generate_calendar", entry.get()))
 
                 # Buttons
                 left_button = Button(self.content_frame, text="Revenir en arrière", bg=self.blue, font=self.font_content,
                                      command=lambda: self.display_content("landing_page"), fg=self.white, width=self.button_width)
                 right_button = Button(self.content_frame, text="Vérifier si la page Notion existe réellement", bg=self.blue, font=self.font_content,
-                                      fg=self.white, command=lambda: self.execute_and_redirect(NotionPage.check_if_root_page_is_valid, "generate_calendar", entry.get()), width=self.button_width+10)
+                                      fg=self.white, command=lambda: self.execute_and_redirect(self.check_if_root_page_is_valid, "generate_calendar", entry.get()), width=self.button_width+10)
                 left_button.grid(row=2, column=0, padx=10, pady=300)
                 right_button.grid(row=2, column=1, padx=10, pady=300)
 
@@ -182,9 +258,27 @@ class AppUI():
                 left_button = Button(self.content_frame, text="Revenir en arrière", bg=self.blue, font=self.font_content,
                                      command=lambda: self.display_content("notion_root_page"), fg=self.white, width=self.button_width)
                 right_button = Button(self.content_frame, text="Générer calendrier", bg=self.blue, font=self.font_content,
-                                      fg=self.white, command=lambda: NotionPage.create_pages_from_config(self.config, self.notion_root_page_id), width=self.button_width+10)
-                left_button.grid(row=2, column=0, padx=10, pady=300)
-                right_button.grid(row=2, column=1, padx=10, pady=300)
+                                      fg=self.white, command=lambda: self.start_generation("generate"), width=self.button_width+10)
+                sync_button = Button(self.content_frame, text="Synchroniser les calendriers existants", bg=self.blue, font=self.font_content,
+                                     fg=self.white, command=lambda: self.start_generation("sync"), width=self.button_width+10)
+                cancel_button = Button(self.content_frame, text="Annuler", bg=self.red, font=self.font_content,
+                                       fg=self.white, command=self.cancel_generation, width=self.button_width)
+
+                # Progress of the generation
+                self.progress_bar = ttk.Progressbar(self.content_frame, orient=HORIZONTAL, length=600, mode="determinate")
+                self.progress_label = tk.Label(self.content_frame, text="", bg=self.white, font=self.font_content)
+                self.progress_bar.grid(row=0, column=0, columnspan=2, padx=10, pady=(100, 10))
+                self.progress_label.grid(row=1, column=0, columnspan=2, padx=10, pady=10)
+
+                left_button.grid(row=2, column=0, padx=10, pady=(150, 10))
+                right_button.grid(row=2, column=1, padx=10, pady=(150, 10))
+                cancel_button.grid(row=3, column=0, padx=10, pady=10)
+                sync_button.grid(row=3, column=1, padx=10, pady=10)
+
+                # Buttons enabled only while no generation is running (and the other way around for the cancel button)
+                self.generation_buttons = [left_button, right_button, sync_button]
+                self.cancel_button = cancel_button
+                self.set_generation_running(self.worker is not None)
 
 
             case "a_propos":
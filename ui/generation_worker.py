@@ -0,0 +1,102 @@
+import queue
+import threading
+import time
+from config.config import Config
+from notion.notion_client import NotionClient, RequestCancelled, get_default_client
+from notion.notion_page import NotionPage
+
+
+class GenerationWorker:
+    """Class that runs the generation (or the synchronisation) of the calendar in a background thread
+    The progress is sent as events through a queue that the UI polls, so that the window stays responsive.
+    Each event is a dict with a "type" key, which can be one of the following:
+        - "progress": {"done", "total", "requests_per_second", "eta"} (eta in seconds, None while unknown)
+        - "error": {"message"}
+        - "warning": {"messages"} the pages that must be updated by hand
+        - "finished": {"status"} where status is "done", "cancelled" or "failed"
+    """
+
+    def __init__(self, config: Config, notion_root_page_id: str, mode: str = "generate", client: NotionClient = None) -> None:
+        """Constructor of the GenerationWorker class
+        :param config: the configuration
+        :param notion_root_page_id: the id of the Notion page under which the calendar is generated
+        :param mode: can be one of the following: "generate" (create_pages_from_config), "sync" (sync_pages_from_config)
+        :param client: the Notion client used to send the requests (the default client is used if None)
+        """
+        self.config = config
+        self.notion_root_page_id = notion_root_page_id
+        self.mode = mode
+        self.client = client if client is not None else get_default_client()
+
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+        # Time and number of requests sent when the run started (to compute the throughput)
+        self.start_time = 0
+        self.start_nb_requests = 0
+
+    def start(self) -> None:
+        """Start the run in the background thread"""
+        self.thread.start()
+
+    def cancel(self) -> None:
+        """Ask the run to stop: the requests not sent yet are cancelled (what is already created stays in the journal)"""
+        self.cancel_event.set()
+
+    def is_running(self) -> bool:
+        """Return True while the run is not finished"""
+        return self.thread.is_alive()
+
+    def run(self) -> None:
+        """Run the generation or the synchronisation and send the events (executed by the background thread)"""
+
+        self.start_time = time.monotonic()
+        self.start_nb_requests = self.client.scheduler.get_stats()["nb_requests"]
+        self.client.cancel_event = self.cancel_event
+
+        status = "done"
+        try:
+            if self.mode == "sync":
+                NotionPage.sync_pages_from_config(self.config, self.notion_root_page_id, client=self.client)
+            else:
+                manual_actions = NotionPage.create_pages_from_config(self.config, self.notion_root_page_id, client=self.client, on_progress=self.report_progress)
+                if manual_actions:
+                    self.events.put({"type": "warning", "messages": manual_actions})
+        except Exception as error:
+            if self.cancel_event.is_set() or isinstance(error, RequestCancelled):
+                status = "cancelled"
+            else:
+                status = "failed"
+                self.events.put({"type": "error", "message": f"{error}"})
+        finally:
+            self.client.cancel_event = None
+
+        self.events.put({"type": "finished", "status": status})
+
+    def report_progress(self, done: int, total: int) -> None:
+        """Send a progress event (called by the executor each time a node is done)
+        :param done: the number of nodes done
+        :param total: the total number of nodes
+        """
+
+        elapsed = time.monotonic() - self.start_time
+        nb_requests = self.client.scheduler.get_stats()["nb_requests"] - self.start_nb_requests
+
+        self.events.put({
+            "type": "progress",
+            "done": done,
+            "total": total,
+            "requests_per_second": nb_requests / elapsed if elapsed > 0 else 0.0,
+            "eta": elapsed / done * (total - done) if done else None
+        })
+
+    def get_events(self) -> list[dict]:
+        """Return the events sent since the last call, without waiting (called by the UI)"""
+
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
@@ -0,0 +1,114 @@
+import datetime
+from typing import NamedTuple
+from utils.utils import HolidayCalendar, day_to_value, get_holiday_calendar, parse_date
+
+
+# Number of weeks of a school year
+NUMBER_OF_WEEKS_IN_YEAR = 45
+
+
+class Lesson(NamedTuple):
+    """One lesson of a class (= one row of the year database)"""
+    week_number: int
+    course_number: int
+    date: str
+    duration: str
+    modality: list
+    group_week: int
+
+
+def course_duration(start_course: str, end_course: str) -> str:
+    """Return the duration of a course that is not during a holiday (same result as date_to_course_duration)
+    :param start_course: the start time of the course (HH:MM)
+    :param end_course: the end time of the course (HH:MM)
+    """
+
+    # Check if the course takes place during more than 60 minutes (15 minutes margin)
+    start_course_time = datetime.datetime.strptime(start_course, "%H:%M")
+    end_course_time = datetime.datetime.strptime(end_course, "%H:%M")
+
+    if (end_course_time - start_course_time).seconds >= 3000:
+        return "2 périodes complètes"
+    else:
+        return "1 période complète"
+
+
+class LessonCalendar:
+    """Class that computes in one pass all lesson dates, holiday flags, durations and week series of the classes of a configuration
+    The dates are handled as ordinals: no date is parsed or formatted more than once.
+    """
+
+    def __init__(self, config_dict: dict) -> None:
+        """Constructor of the LessonCalendar class
+        :param config_dict: the configuration dictionary
+        """
+        self.config_dict = config_dict
+        self.holiday_calendar: HolidayCalendar = get_holiday_calendar(config_dict["infos_generales"])
+        self.monday_week_0 = parse_date(config_dict["infos_generales"]["lundi_semaine_0"]).toordinal()
+
+        # Date string of each ordinal already formatted (shared by all classes)
+        self.date_strings = {}
+
+    def date_string(self, ordinal: int) -> str:
+        """Return the date string (YYYY-MM-DD) of an ordinal
+        :param ordinal: the proleptic Gregorian ordinal of the day
+        """
+        date = self.date_strings.get(ordinal)
+        if date is None:
+            date = self.date_strings[ordinal] = datetime.date.fromordinal(ordinal).isoformat()
+        return date
+
+    def lessons_for_a_class(self, year: str, class_name: str) -> list[Lesson]:
+        """Return all lessons of a class in the row order of the database (week by week, course 1 then course 2)
+        :param year: The year of the class (1gy, 2gy, 1ecg, 2ecg, 2ec, 3ec).
+        :param class_name: The name of the class.
+        """
+
+        ecole = "gymnase" if "gy" in year else "ecg" if "ecg" in year else "ec"
+        class_info = self.config_dict["niveaux"][ecole][year]["classes"][class_name]
+
+        # A course is given by (ordinal of its day in week 0, course info, number of the course), the second course is optional
+        courses = [(self.monday_week_0 + day_to_value(class_info["cours_1"]["jour"]), class_info["cours_1"], 1)]
+        if class_info["cours_2"]["jour"]:
+            courses.append((self.monday_week_0 + day_to_value(class_info["cours_2"]["jour"]), class_info["cours_2"], 2))
+
+        # Duration of each course outside holidays, computed once (only if needed, the times may be empty otherwise)
+        durations = [None] * len(courses)
+        lesson_modality = HolidayCalendar.MODALITIES[HolidayCalendar.LESSON]
+
+        lessons = []
+        counter_group_week = 0
+        for week_number in range(NUMBER_OF_WEEKS_IN_YEAR):
+            group_week = -(-counter_group_week // 4)
+            vacances_in_all_courses = len(courses) == 2
+
+            for index, (first_ordinal, course_info, course_number) in enumerate(courses):
+                ordinal = first_ordinal + 7 * week_number
+                kind = self.holiday_calendar.kind_of_ordinal(ordinal)
+
+                if kind == HolidayCalendar.LESSON:
+                    if durations[index] is None:
+                        durations[index] = course_duration(course_info["heure_debut"], course_info["heure_fin"])
+                    duration = durations[index]
+                else:
+                    duration = "-"
+
+                vacances_in_all_courses = vacances_in_all_courses and kind == HolidayCalendar.VACANCES
+                lessons.append(Lesson(week_number, course_number, self.date_string(ordinal), duration, [HolidayCalendar.MODALITIES[kind]] if kind != HolidayCalendar.LESSON else [lesson_modality], group_week))
+
+            # Ignore the holidays week to create the group of 4 weeks
+            if not vacances_in_all_courses:
+                counter_group_week += 1
+
+        return lessons
+
+    def lessons_for_all_classes(self) -> dict:
+        """Return the lessons of every class that is not empty, by (year, class name)"""
+
+        lessons = {}
+        for niveau in self.config_dict["niveaux"]:
+            for annee in self.config_dict["niveaux"][niveau]:
+                for classe, class_info in self.config_dict["niveaux"][niveau][annee]["classes"].items():
+                    if not class_info["nb_eleves"] == 0:
+                        lessons[(annee, classe)] = self.lessons_for_a_class(annee, classe)
+        return lessons
@@ -0,0 +1,41 @@
+import logging
+from typing import Callable
+
+
+# Logger of the whole app, the messages for the user are always logged
+logger = logging.getLogger("notion_school_calendar")
+
+# Functions displaying the messages to the user (message boxes in the GUI), set by the UI
+_error_handler = None
+_warning_handler = None
+
+
+def set_message_handlers(error_handler: Callable[[str, str], None], warning_handler: Callable[[str, str], None]) -> None:
+    """Set the functions that display the errors and the warnings to the user (e.g. messagebox.showerror and messagebox.showwarning)
+    Without handlers (headless run), the messages are only logged.
+    :param error_handler: the function called with the title and the message of an error
+    :param warning_handler: the function called with the title and the message of a warning
+    """
+    global _error_handler, _warning_handler
+    _error_handler = error_handler
+    _warning_handler = warning_handler
+
+
+def show_error(title: str, message: str) -> None:
+    """Log an error and display it to the user if a handler is set
+    :param title: the title of the message
+    :param message: the message
+    """
+    logger.error(message)
+    if _error_handler is not None:
+        _error_handler(title, message)
+
+
+def show_warning(title: str, message: str) -> None:
+    """Log a warning and display it to the user if a handler is set
+    :param title: the title of the message
+    :param message: the message
+    """
+    logger.warning(message)
+    if _warning_handler is not None:
+        _warning_handler(title, message)
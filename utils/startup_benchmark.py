@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+# Root of the repository (the app loads its images with paths relative to it)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# File where the reference time-to-first-frame is saved (see --save-baseline)
+BASELINE_PATH = os.path.join(REPO_ROOT, ".startup_baseline.json")
+
+# Modules that must not be imported before the landing page is shown (they are only needed once a config is loaded)
+DEFERRED_MODULES = ["requests", "jsonschema", "dotenv", "notion.notion_client", "notion.notion_page", "notion.notion_db"]
+
+# Return codes of the benchmark
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_NO_DISPLAY = 2
+
+# Code executed in a child interpreter: create the AppUI, draw its first frame, then report and close the window
+FIRST_FRAME_CODE = """
+import json, sys, time, tkinter
+spawn_time = float(sys.argv[1])
+
+def first_frame(root, n=0):
+    root.update()
+    print(json.dumps({"first_frame": time.time() - spawn_time, "modules": sorted(sys.modules)}))
+    root.destroy()
+
+tkinter.Tk.mainloop = first_frame
+try:
+    from notion_school_calendar import main
+    main()
+except tkinter.TclError as error:
+    print(json.dumps({"error": str(error)}))
+"""
+
+
+def parse_import_times(stderr: str, module: str) -> list[dict]:
+    """Parse the output of python -X importtime and return the cost of the module and of the modules it imports
+    The modules imported by the interpreter itself at startup (site, ...) are left out.
+    :param stderr: the standard error of the interpreter
+    :param module: the module imported
+    """
+
+    # The modules imported by a module are listed just before it, with a deeper indentation
+    subtree = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative_time, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip()) - 1
+        subtree.append({"module": name.strip(), "self": int(self_time), "cumulative": int(cumulative_time)})
+        if depth == 0:
+            if name.strip() == module:
+                return subtree
+            subtree = []
+    return []
+
+
+def measure_import_times(module: str = "notion_school_calendar") -> list[dict]:
+    """Import a module in a fresh interpreter and return the cost of each module it imports, sorted by cumulative time
+    :param module: the module imported
+    """
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=REPO_ROOT, capture_output=True, text=True)
+    return sorted(parse_import_times(result.stderr, module), key=lambda import_time: import_time["cumulative"], reverse=True)
+
+
+def measure_first_frame() -> dict:
+    """Start the app in a fresh interpreter and return the time (in seconds, from the spawn of the process) until the first frame is drawn, with the modules imported at that time"""
+
+    spawn_time = time.time()
+    result = subprocess.run([sys.executable, "-c", FIRST_FRAME_CODE, str(spawn_time)], cwd=REPO_ROOT, capture_output=True, text=True)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"The app couldn't be started: {result.stderr.strip()}")
+    return json.loads(lines[-1])
+
+
+def load_baseline(path: str = BASELINE_PATH) -> float | None:
+    """Return the time-to-first-frame saved as reference, or None if there isn't one
+    :param path: the path of the baseline file
+    """
+
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)["first_frame"]
+
+
+def save_baseline(first_frame: float, path: str = BASELINE_PATH) -> None:
+    """Save the time-to-first-frame as reference
+    :param first_frame: the time-to-first-frame (in seconds)
+    :param path: the path of the baseline file
+    """
+
+    with open(path, "w") as f:
+        json.dump({"first_frame": first_frame, "python": sys.version.split()[0]}, f, indent=4)
+
+
+def main(argv: list = None) -> int:
+    """Print the import cost of the app per module, measure the time-to-first-frame of AppUI and return a non-zero code if it regressed
+    :param argv: the arguments of the command line (sys.argv[1:] if None)
+    """
+
+    parser = argparse.ArgumentParser(description="Startup benchmark of the GUI")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="number of starts of the app (the median is kept)")
+    parser.add_argument("--top", type=int, default=15, help="number of modules shown in the import breakdown")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown compared to the baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="save the measured time as the new baseline")
+    args = parser.parse_args(argv)
+
+    # Import cost of the app, per module
+    import_times = measure_import_times()
+    print(f"{'module':<50} {'self [ms]':>10} {'cumulative [ms]':>16}")
+    for import_time in import_times[:args.top]:
+        print(f"{import_time['module']:<50} {import_time['self'] / 1000:>10.1f} {import_time['cumulative'] / 1000:>16.1f}")
+
+    # Time-to-first-frame
+    runs = []
+    for _ in range(args.runs):
+        run = measure_first_frame()
+        if "error" in run:
+            print(f"No display available, the first frame can't be measured: {run['error']}")
+            return EXIT_NO_DISPLAY
+        runs.append(run)
+    first_frame = statistics.median(run["first_frame"] for run in runs)
+    print(f"\nTime to first frame: {first_frame * 1000:.0f} ms (median of {len(runs)} runs)")
+
+    status = EXIT_OK
+
+    # The heavy dependencies must still be deferred
+    imported_too_early = [module for module in DEFERRED_MODULES if any(module in run["modules"] for run in runs)]
+    if imported_too_early:
+        print(f"Imported before the first frame: {', '.join(imported_too_early)}")
+        status = EXIT_REGRESSION
+
+    if args.save_baseline:
+        save_baseline(first_frame)
+        print(f"Baseline saved in {BASELINE_PATH}")
+        return status
+
+    baseline = load_baseline()
+    if baseline is None:
+        print("No baseline yet (use --save-baseline)")
+    elif first_frame > baseline * (1 + args.tolerance):
+        print(f"Regression: {first_frame * 1000:.0f} ms > {baseline * 1000:.0f} ms (baseline) + {args.tolerance:.0%}")
+        status = EXIT_REGRESSION
+    else:
+        print(f"Baseline: {baseline * 1000:.0f} ms")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import datetime
+import functools
 
 def day_to_value(day: str) -> int:
     """Convert a day to a value"""
@@ -40,23 +41,89 @@ def date_to_course_duration(holidays_dict: dict, date_course, start_course, end_
 def date_is_holiday(holidays_dict: dict, date) -> tuple:
     """Check if a date is a holiday"""
 
-    date = datetime.datetime.strptime(date, "%Y-%m-%d")
+    return get_holiday_calendar(holidays_dict).lookup(date)
 
-    # Check if the date is a holiday
-    for vacance in holidays_dict["vacances"]:
-    
-        date_debut = datetime.datetime.strptime(holidays_dict["vacances"][vacance]["date_debut"], "%Y-%m-%d")
-        date_fin = datetime.datetime.strptime(holidays_dict["vacances"][vacance]["date_fin"], "%Y-%m-%d")
 
-        if date >= date_debut and date <= date_fin:
-            return (True, ["⛱ Vacances"])
-        
-    # Check if the date is a public holiday
-    for day_off in holidays_dict["jours_feries"]:
-        date_debut = datetime.datetime.strptime(holidays_dict["jours_feries"][day_off]["date_debut"], "%Y-%m-%d")
-        date_fin = datetime.datetime.strptime(holidays_dict["jours_feries"][day_off]["date_fin"], "%Y-%m-%d")
+def parse_date(date: str) -> datetime.date:
+    """Convert a date string (YYYY-MM-DD) to a date"""
 
-        if date >= date_debut and date <= date_fin:
-            return (True, ["⛱ Jour férié"])
-        
-    return (False, ["📒 Leçon"])
+    # fromisoformat is much faster than strptime, which is only needed for dates that are not zero-padded
+    try:
+        return datetime.date.fromisoformat(date)
+    except ValueError:
+        return datetime.datetime.strptime(date, "%Y-%m-%d").date()
+
+
+class HolidayCalendar:
+    """Class that tells in O(1) if a date is a holiday, using one byte per day of the school year"""
+
+    # Kind of each day and the associated modality
+    LESSON = 0
+    VACANCES = 1
+    JOUR_FERIE = 2
+    MODALITIES = {
+        LESSON: "📒 Leçon",
+        VACANCES: "⛱ Vacances",
+        JOUR_FERIE: "⛱ Jour férié"
+    }
+
+    def __init__(self, holidays_dict: dict) -> None:
+        """Constructor of the HolidayCalendar class, each date of the configuration is parsed only once
+        :param holidays_dict: the "infos_generales" dict of the configuration (with "vacances" and "jours_feries")
+        """
+
+        # Public holidays first: the vacations overwrite them, as a date is first checked against the vacations
+        intervals = []
+        for day_off in holidays_dict["jours_feries"].values():
+            intervals.append((parse_date(day_off["date_debut"]).toordinal(), parse_date(day_off["date_fin"]).toordinal(), self.JOUR_FERIE))
+        for vacance in holidays_dict["vacances"].values():
+            intervals.append((parse_date(vacance["date_debut"]).toordinal(), parse_date(vacance["date_fin"]).toordinal(), self.VACANCES))
+
+        # Kind of each day between the first and the last day of all intervals
+        self.first_ordinal = min([start for start, _, _ in intervals], default=0)
+        last_ordinal = max([end for _, end, _ in intervals], default=-1)
+        self.days = bytearray(max(0, last_ordinal - self.first_ordinal + 1))
+
+        for start, end, kind in intervals:
+            if end >= start:
+                self.days[start - self.first_ordinal:end - self.first_ordinal + 1] = bytes([kind]) * (end - start + 1)
+
+    def kind_of_ordinal(self, ordinal: int) -> int:
+        """Return the kind of a day (LESSON, VACANCES or JOUR_FERIE) given its ordinal
+        :param ordinal: the proleptic Gregorian ordinal of the day
+        """
+        offset = ordinal - self.first_ordinal
+        if 0 <= offset < len(self.days):
+            return self.days[offset]
+        return self.LESSON
+
+    def lookup(self, date: str) -> tuple:
+        """Check if a date is a holiday, return the same tuple as date_is_holiday: (is_holiday, [modality])
+        :param date: the date (YYYY-MM-DD)
+        """
+        kind = self.kind_of_ordinal(parse_date(date).toordinal())
+        return (kind != self.LESSON, [self.MODALITIES[kind]])
+
+    def lookup_many(self, dates: list[str]) -> list[tuple]:
+        """Check if each date of a list is a holiday
+        :param dates: the dates (YYYY-MM-DD)
+        """
+        return [self.lookup(date) for date in dates]
+
+
+def get_holiday_calendar(holidays_dict: dict) -> HolidayCalendar:
+    """Return the holiday calendar of the given holidays, built only once for the same dates"""
+
+    # The key contains all the dates, so that a calendar is built again as soon as a date is edited
+    key = tuple((section, name, dates["date_debut"], dates["date_fin"]) for section in ("vacances", "jours_feries") for name, dates in holidays_dict[section].items())
+    return _build_holiday_calendar(key)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_holiday_calendar(key: tuple) -> HolidayCalendar:
+    """Build a holiday calendar from the key computed by get_holiday_calendar"""
+
+    holidays_dict = {"vacances": {}, "jours_feries": {}}
+    for section, name, date_debut, date_fin in key:
+        holidays_dict[section][name] = {"date_debut": date_debut, "date_fin": date_fin}
+    return HolidayCalendar(holidays_dict)